@@ -0,0 +1,105 @@
+# Path: bench_extraction.py
+"""
+Micro-benchmark of the article extraction backends.
+
+Pages come from the HTTP cache (http_cache.db) when it holds article pages of the
+scraped sources; otherwise a synthetic page with the same selectors is used.
+
+    python bench_extraction.py --pages 50 --repeat 5
+"""
+import argparse
+import os
+import sqlite3
+import time
+from urllib.parse import urlsplit
+from extraction import SoupExtractor, available_backends, get_extractor
+from scrapers import SCRAPERS
+
+
+def synthetic_page(selectors: dict, paragraphs: int = 40, boilerplate: int = 400) -> str:
+    """A page with the selected elements buried in navigation-style boilerplate."""
+    parts = ['<html><head><title>bench</title></head><body>']
+    parts += [f'<div class="nav"><a href="/link/{i}">Link {i}</a></div>' for i in range(boilerplate)]
+    for field, selector in selectors.items():
+        compounds = selector.split()
+        if field != 'content':
+            inner = f'Sample {field}'
+        elif '.' in compounds[-1]:
+            inner = ''.join(f'<p>Paragraph {i} of the article body.</p>' for i in range(paragraphs))
+        else:
+            # e.g. 'div.articleBody p' matches one element per paragraph
+            tag = compounds.pop()
+            inner = ''.join(f'<{tag}>Paragraph {i} of the article body.</{tag}>' for i in range(paragraphs))
+        for compound in reversed(compounds):
+            tag, *classes = compound.split('.')
+            tag = tag or 'div'
+            inner = f'<{tag} class="{" ".join(classes)}">{inner}</{tag}>'
+        parts.append(inner)
+    parts += [f'<footer><a href="/footer/{i}">Footer {i}</a></footer>' for i in range(boilerplate // 4)]
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def cached_pages(path: str, limit: int) -> list:
+    """(selectors, html) pairs for cached article pages of the known sources."""
+    if not os.path.exists(path):
+        return []
+    selectors_by_host = {urlsplit(scraper.SOURCE).netloc: scraper.SELECTORS for scraper in SCRAPERS}
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT url, body FROM pages ORDER BY last_used DESC").fetchall()
+    finally:
+        conn.close()
+    pages = []
+    for url, body in rows:
+        selectors = selectors_by_host.get(urlsplit(url).netloc)
+        if selectors and get_extractor('html.parser').extract(body, selectors).get('title'):
+            pages.append((selectors, body))
+            if len(pages) >= limit:
+                break
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare parse time per page across extraction backends.")
+    parser.add_argument('--pages', type=int, default=50, help="Number of pages to extract")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed passes per backend; the best is reported")
+    parser.add_argument('--cache', default='http_cache.db', help="HTTP cache to read article pages from")
+    args = parser.parse_args()
+
+    pages = cached_pages(args.cache, args.pages)
+    if pages:
+        print(f"Using {len(pages)} cached article pages")
+    else:
+        pages = [(scraper.SELECTORS, synthetic_page(scraper.SELECTORS)) for scraper in SCRAPERS]
+        pages = [pages[i % len(pages)] for i in range(args.pages)]
+        print(f"No cached article pages, using {len(pages)} synthetic pages")
+
+    backends = [(name, get_extractor(name)) for name in available_backends()]
+    if 'lxml' in available_backends():
+        # Same parser over the whole page, to show what region-restricted parsing saves
+        backends.insert(1, ('lxml (full)', SoupExtractor('lxml', restrict=False)))
+
+    reference = [get_extractor('html.parser').extract(html, selectors) for selectors, html in pages]
+    baseline = None
+    for name, extractor in backends:
+        # Warm up, and check the backend extracts the same fields as html.parser
+        results = [extractor.extract(html, selectors) for selectors, html in pages]
+        agree = sum(result == ref for result, ref in zip(results, reference))
+
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for selectors, html in pages:
+                extractor.extract(html, selectors)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        per_page = best / len(pages) * 1000
+        baseline = baseline or per_page
+        print(f"{name:12} {per_page:8.2f} ms/page  {baseline / per_page:5.1f}x  "
+              f"pages matching html.parser: {agree}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# Path: bench_summarizer.py
+"""
+Benchmark of the summarizer backends on a fixed local corpus.
+
+    python bench_summarizer.py
+    python bench_summarizer.py --config torch --config int8 --config torch:sshleifer/distilbart-cnn-12-6
+
+Each --config is "backend[:model]". The corpus (bench_corpus.json) is built on the
+first run from article pages in the HTTP cache and kept, so later runs summarize the
+same texts. Reference summaries from the fp32 default model are stored with it and
+ROUGE drift is measured against them. Every configuration runs in its own process,
+so its peak RSS covers that model alone.
+"""
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+from summarizer import BACKENDS, MODEL_NAME, Summarizer, get_rss_mb
+
+MAX_LENGTH = 130
+MIN_LENGTH = 50
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB; the current RSS where that is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return get_rss_mb()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def build_corpus(cache_path: str, size: int) -> list:
+    """Article texts extracted from the cached pages of the known sources."""
+    from bench_extraction import cached_pages
+    from extraction import get_extractor
+    extractor = get_extractor('lxml')
+    texts = []
+    for selectors, html in cached_pages(cache_path, size):
+        content = extractor.extract(html, selectors).get('content')
+        if content:
+            texts.append(content)
+    return texts
+
+
+def run_config(backend: str, model: str, texts: list, batch_size: int, num_threads: int,
+               max_chunks: int = 1) -> dict:
+    """Load one summarizer configuration and time it over the corpus. Runs in a fresh process."""
+    summarizer = Summarizer(model, num_threads, backend)
+    summarizer.load()
+    summaries = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        summaries += summarizer.summarize_batch(texts[i:i + batch_size], MAX_LENGTH, MIN_LENGTH, max_chunks)
+    seconds = time.perf_counter() - start
+    return {
+        'load_seconds': summarizer.load_seconds,
+        'articles_per_sec': len(texts) / seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'summaries': summaries,
+    }
+
+
+def run_isolated(*args) -> dict:
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_config, *args).result()
+
+
+def _tokens(text: str) -> list:
+    return re.findall(r'\w+', text.lower())
+
+
+def _f1(overlap: int, hyp_total: int, ref_total: int) -> float:
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / hyp_total, overlap / ref_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(reference: str, hypothesis: str, n: int) -> float:
+    """ROUGE-N F1 of a hypothesis against one reference."""
+    def ngrams(tokens):
+        return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    ref, hyp = ngrams(_tokens(reference)), ngrams(_tokens(hypothesis))
+    return _f1(sum((ref & hyp).values()), sum(hyp.values()), sum(ref.values()))
+
+
+def rouge_l(reference: str, hypothesis: str) -> float:
+    """ROUGE-L F1: longest common subsequence of tokens."""
+    ref, hyp = _tokens(reference), _tokens(hypothesis)
+    previous = [0] * (len(hyp) + 1)
+    for ref_token in ref:
+        current = [0]
+        for j, hyp_token in enumerate(hyp):
+            current.append(previous[j] + 1 if ref_token == hyp_token else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(hyp), len(ref))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare summarizer backends on a fixed local corpus.")
+    parser.add_argument('--config', action='append', dest='configs',
+                        help='"backend[:model]"; repeatable (default: every backend with the default model)')
+    parser.add_argument('--corpus', default='bench_corpus.json', help="Corpus file, created on the first run")
+    parser.add_argument('--cache', default='http_cache.db', help="HTTP cache the corpus is built from")
+    parser.add_argument('--size', type=int, default=32, help="Number of articles in a new corpus")
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=None, help="CPU threads per model (default: all)")
+    parser.add_argument('--max-chunks', type=int, default=1, help="Summarize long articles in up to this many chunks")
+    args = parser.parse_args()
+
+    if os.path.exists(args.corpus):
+        with open(args.corpus) as f:
+            corpus = json.load(f)
+    else:
+        corpus = {'texts': build_corpus(args.cache, args.size)}
+        if not corpus['texts']:
+            sys.exit(f"No article pages in {args.cache} to build a corpus from; run the scrapers first.")
+    texts = corpus['texts']
+    print(f"Corpus: {len(texts)} articles from {args.corpus}")
+
+    results = {}
+    if 'reference' not in corpus:
+        # The reference is always the truncating fp32 default model
+        print(f"Computing reference summaries with torch:{MODEL_NAME}...")
+        reference = run_isolated('torch', MODEL_NAME, texts, args.batch_size, args.threads)
+        if args.max_chunks <= 1:
+            results[('torch', MODEL_NAME)] = reference
+        corpus['reference'] = reference['summaries']
+        with open(args.corpus, 'w') as f:
+            json.dump(corpus, f, indent=1)
+
+    configs = []
+    for spec in args.configs or list(BACKENDS):
+        backend, _, model = spec.partition(':')
+        if backend not in BACKENDS:
+            parser.error(f"Unknown backend {backend}; choose from {', '.join(BACKENDS)}")
+        configs.append((backend, model or MODEL_NAME))
+
+    print(f"{'Configuration':<50} {'Load':>6} {'Art/s':>7} {'Peak RSS':>9} {'R-1':>5} {'R-2':>5} {'R-L':>5}")
+    for backend, model in configs:
+        result = results.get((backend, model))
+        if result is None:
+            try:
+                result = run_isolated(backend, model, texts, args.batch_size, args.threads, args.max_chunks)
+            except Exception as e:
+                print(f"{backend + ':' + model:<50} failed: {e}")
+                continue
+        pairs = list(zip(corpus['reference'], result['summaries']))
+        scores = [sum(score(ref, hyp) for ref, hyp in pairs) / len(pairs)
+                  for score in (lambda r, h: rouge_n(r, h, 1), lambda r, h: rouge_n(r, h, 2), rouge_l)]
+        print(f"{backend + ':' + model:<50} {result['load_seconds']:>5.1f}s {result['articles_per_sec']:>7.2f} "
+              f"{result['peak_rss_mb']:>6.0f} MB " + " ".join(f"{score:>5.2f}" for score in scores))
+
+
+if __name__ == "__main__":
+    main()
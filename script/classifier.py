@@ -0,0 +1,94 @@
+# Path: classifier.py
+import json
+import re
+from collections import Counter
+from workers import get_shared
+
+
+def _trie_pattern(words: list) -> str:
+    """
+    Regex alternation for the words, factored into a trie so that matching
+    cost grows with keyword length rather than with the number of keywords.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{pattern})?' if end else pattern
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    """
+    Classifies text into attack types by keyword hits. All keywords are
+    compiled into one regex, so each text is scanned once however many
+    keywords there are. Keywords match whole words (plus a plural "s"/"es"),
+    case-insensitively, and may span any whitespace between their words.
+    """
+
+    def __init__(self, attack_types: dict):
+        self.attack_types = attack_types
+        # Category order breaks ties between equal scores
+        self.categories = list(attack_types)
+        self._categories_by_keyword = {}
+        for category, keywords in attack_types.items():
+            for keyword in keywords:
+                key = self._normalize(keyword)
+                self._categories_by_keyword.setdefault(key, [])
+                if category not in self._categories_by_keyword[key]:
+                    self._categories_by_keyword[key].append(category)
+        # Spaces inside a keyword are a placeholder for any run of whitespace
+        body = _trie_pattern(sorted(self._categories_by_keyword)).replace(r'\ ', r'\s+')
+        # Lookarounds rather than \b, so keywords that start or end with a symbol (c++, .net) match too
+        self._pattern = re.compile(rf'(?<!\w)({body})(?:e?s)?(?!\w)', re.IGNORECASE) if body else None
+
+    @staticmethod
+    def _normalize(keyword: str) -> str:
+        return ' '.join(keyword.lower().split())
+
+    def scores(self, text: str) -> Counter:
+        """Number of keyword hits per category."""
+        scores = Counter()
+        if not text or self._pattern is None:
+            return scores
+        for match in self._pattern.finditer(text):
+            for category in self._categories_by_keyword.get(self._normalize(match.group(1)), ()):
+                scores[category] += 1
+        return scores
+
+    def labels(self, text: str, min_hits: int = 1) -> list:
+        """Every category with at least min_hits hits, best first."""
+        scores = self.scores(text)
+        ranked = sorted(scores, key=lambda category: (-scores[category], self.categories.index(category)))
+        return [category for category in ranked if scores[category] >= min_hits]
+
+    def classify(self, text: str) -> str:
+        """The category with the most hits, or None if no keyword matches."""
+        labels = self.labels(text)
+        return labels[0] if labels else None
+
+    def classify_batch(self, texts: list, multi_label: bool = False) -> list:
+        """Classify many texts; each result is a category, or a list of them with multi_label."""
+        if multi_label:
+            return [self.labels(text) for text in texts]
+        return [self.classify(text) for text in texts]
+
+
+def _load_classifier(path: str) -> KeywordClassifier:
+    with open(path, 'r') as f:
+        return KeywordClassifier(json.load(f))
+
+
+def get_classifier(path: str) -> KeywordClassifier:
+    """Return the process-wide classifier for a keywords file, compiled on first call."""
+    return get_shared(f"classifier:{path}", _load_classifier, path)
@@ -1,9 +1,23 @@
+import asyncio
 import random
-import json
-import requests
 import logging
-from transformers import pipeline
 import os
+from collections import Counter
+from urllib.parse import urlencode
+from bs4 import BeautifulSoup
+from classifier import get_classifier
+from extraction import extract_fields, get_extractor, soup_features
+from frontier import get_frontier
+from http_cache import get_http_cache
+from ingest import RETRY_STATUSES
+from limits import get_request_limiter
+from membership import normalize_url
+from sinks import get_sink
+from summarizer import MODEL_NAME, get_summarizer, get_summary_queue
+from summary_cache import get_summary_cache
+from sync import get_known_articles
+from watermarks import get_watermarks
+from workers import get_executor, run_in_pool
 
 # Configure logging
 logging.basicConfig(
@@ -20,57 +34,333 @@ USER_AGENTS = [
 ]
 
 class NewsScraperConfig:
-    BATCH_SIZE = 5
     TIMEOUT = 30
+    # Summarization model, e.g. "sshleifer/distilbart-cnn-12-6" for a smaller distilled model, and how
+    # it runs on CPU: "torch" (fp32), "int8" (dynamically quantized) or "onnx" (ONNX Runtime)
+    SUMMARY_MODEL = MODEL_NAME
+    SUMMARY_BACKEND = "torch"
+    # Set to False to skip the model and use the opening LEAD_CHARS characters of each article as its summary
+    SUMMARIZE = True
+    LEAD_CHARS = 300
+    # Set to True to scrape without uploading articles or recording progress (watermarks, frontier)
+    DRY_RUN = False
+    # Articles from all scrapers are summarized together in batches of this size
+    SUMMARY_BATCH_SIZE = 8
+    # Seconds a pending article may wait for its batch to fill up
+    SUMMARY_MAX_WAIT = 0.5
+    # Articles longer than the model's input window are truncated to it by the tokenizer.
+    # Above 1, they are instead summarized in up to this many chunks, then summarized again (map-reduce).
+    SUMMARY_MAX_CHUNKS = 1
+    # Summarization runs off the event loop in a "thread" or "process" pool.
+    # With "process", every worker loads its own copy of the model.
+    SUMMARY_EXECUTOR = "thread"
+    SUMMARY_WORKERS = 1
+    # Max CPU threads the model may use per worker (None = torch default, all cores)
+    INFERENCE_THREADS = None
+    # Article pages are parsed in a "thread" or "process" pool of PARSE_WORKERS workers.
+    # Listing pages are always parsed in threads, since the scrapers walk their parse trees.
+    PARSE_EXECUTOR = "thread"
+    PARSE_WORKERS = 4
+    # Article extraction backend: "lxml", "selectolax" or "html.parser"
+    EXTRACT_BACKEND = "lxml"
+    # Workers per crawl pipeline stage, and the size of the queue feeding each stage
+    FETCH_CONCURRENCY = 4
+    EXTRACT_CONCURRENCY = 2
+    # Enough articles in flight per scraper to fill a summary batch
+    SUMMARIZE_CONCURRENCY = SUMMARY_BATCH_SIZE
+    STAGE_QUEUE_SIZE = 20
+    # On-disk summary cache, evicting least recently used entries past the limit
+    SUMMARY_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'summary_cache.db')
+    SUMMARY_CACHE_MAX_ENTRIES = 50000
+    # Limits on in-flight HTTP requests across all scrapers, and per host
+    MAX_CONCURRENT_REQUESTS = 16
+    MAX_REQUESTS_PER_HOST = 4
+    # Requests per second per host: the starting rate and the range it adapts within
+    HOST_RATE = 2.0
+    HOST_MIN_RATE = 0.2
+    HOST_MAX_RATE = 10.0
+    # Longest Retry-After pause honored, and the base and cap of the retry backoff, in seconds
+    MAX_RETRY_AFTER = 120
+    RETRY_BACKOFF = 1.0
+    RETRY_BACKOFF_MAX = 30
     FLASK_SERVER_URL = "https://piyamianglae.pythonanywhere.com/data"
+    # Articles are uploaded in batches over a pool of keep-alive connections
+    UPLOAD_BATCH_SIZE = 10
+    UPLOAD_MAX_CONNECTIONS = 4
+    UPLOAD_RETRIES = 3
+    # Where articles go: "http" uploads to FLASK_SERVER_URL; "jsonl" and "sqlite" write
+    # local files, which lets the crawler run and be benchmarked without the server
+    SINK = "http"
+    JSONL_SINK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'articles.jsonl')
+    SQLITE_SINK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'articles.db')
+    # On-disk HTTP cache of fetched pages, evicting least recently used pages past the limit
+    HTTP_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'http_cache.db')
+    HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    # Serve pages only from the HTTP cache, without network access
+    OFFLINE = False
+    # Newest links seen per source; pagination stops once it reaches them
+    WATERMARKS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watermarks.json')
+    # Set to True to ignore watermarks and walk every listing page
+    FULL_BACKFILL = False
+    # Local copy of the server's known titles and its change cursor
+    SYNC_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'known_articles.json')
+    # Every discovered article URL and its state; failed URLs are retried on later runs up to URL_MAX_RETRIES times
+    FRONTIER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontier.db')
+    URL_MAX_RETRIES = 3
 
     def __init__(self, source):
         self.SOURCE = source
         self.headers = {
             "User-Agent": random.choice(USER_AGENTS)
         }
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+        # Per-source counters for the end-of-run report
+        self.stats = Counter()
+        self.limiter = get_request_limiter(
+            self.MAX_CONCURRENT_REQUESTS, self.MAX_REQUESTS_PER_HOST,
+            rate=self.HOST_RATE, min_rate=self.HOST_MIN_RATE, max_rate=self.HOST_MAX_RATE,
+            max_retry_after=self.MAX_RETRY_AFTER, backoff=self.RETRY_BACKOFF, max_backoff=self.RETRY_BACKOFF_MAX,
+        )
+        self.watermarks = get_watermarks(self.WATERMARKS_PATH)
+        self.frontier = get_frontier(self.FRONTIER_PATH, self.URL_MAX_RETRIES)
+        self.frontier.read_only = self.DRY_RUN
+        self.http_cache = get_http_cache(self.HTTP_CACHE_PATH, self.HTTP_CACHE_MAX_BYTES)
+        sink_path = self.SQLITE_SINK_PATH if self.SINK == "sqlite" else self.JSONL_SINK_PATH
+        self.sink = get_sink(
+            self.SINK, sink_path, self.UPLOAD_BATCH_SIZE,
+            self.FLASK_SERVER_URL, self.UPLOAD_MAX_CONNECTIONS, self.UPLOAD_RETRIES,
+        )
+        # Shared across scrapers; the model itself is loaded on the first summary
+        self.summarizer = get_summarizer(self.INFERENCE_THREADS, self.SUMMARY_MODEL, self.SUMMARY_BACKEND)
+        self.summary_queue = get_summary_queue(
+            self.SUMMARY_BATCH_SIZE, self.SUMMARY_MAX_WAIT,
+            self.SUMMARY_EXECUTOR, self.SUMMARY_WORKERS, self.INFERENCE_THREADS,
+            self.SUMMARY_MODEL, self.SUMMARY_BACKEND, self.SUMMARY_MAX_CHUNKS,
+        )
+        self.parse_executor = get_executor("parse", self.PARSE_EXECUTOR, self.PARSE_WORKERS)
+        if self.PARSE_EXECUTOR == "thread":
+            self.soup_executor = self.parse_executor
+        else:
+            self.soup_executor = get_executor("soup", "thread", self.PARSE_WORKERS)
+        self.extractor = get_extractor(self.EXTRACT_BACKEND)
+        self.summary_cache = get_summary_cache(self.SUMMARY_CACHE_PATH, self.SUMMARY_CACHE_MAX_ENTRIES)
 
         attack_types_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'attack_types.json'))
-        with open(attack_types_path, 'r') as f:
-            self.attack_types = json.load(f)
+        self.classifier = get_classifier(attack_types_path)
+        self.attack_types = self.classifier.attack_types
 
     def classify_content(self, content: str) -> str:
-        """Classify the content into attack types based on keywords."""
-        content_lower = content.lower()
-        for category, keywords in self.attack_types.items():
-            if any(keyword in content_lower for keyword in keywords):
-                return category
+        """Classify the content into the attack type with the most keyword hits."""
+        return self.classifier.classify(content)
+
+    def load_processed_titles(self) -> set:
+        """Titles already in the sink, shared by all scrapers. The Flask server's are synced incrementally."""
+        if self.SINK != "http":
+            return self.sink.titles
+        known = get_known_articles(self.SYNC_STATE_PATH, self.FLASK_SERVER_URL)
+        known.sync()
+        return known.titles
+
+    def reached_known_content(self, links: list) -> bool:
+        """
+        True if pagination can stop: the listing page reaches this source's
+        watermark or, for a source without one, every link on it is already in
+        the sink or done in the frontier. With a watermark, pages of known links
+        are walked through, since an interrupted run may have left a gap below them.
+        """
+        if self.FULL_BACKFILL or not links:
+            return False
+        if self.watermarks.has(self.SOURCE):
+            return self.watermarks.reached(self.SOURCE, links)
+        if self.SINK != "http":
+            has_url = self.sink.has_url
+        else:
+            has_url = get_known_articles(self.SYNC_STATE_PATH, self.FLASK_SERVER_URL).has_url
+        return all(has_url(link) or self.frontier.is_done(link) for link in links)
+
+    def advance_watermark(self, newest_links: list, covered: bool):
+        """
+        Record the newest links of a run as this source's watermark. A run that
+        stopped before the old watermark (covered is False) leaves it in place,
+        so the next run walks down to it, unless this is a first or backfill run.
+        """
+        if self.DRY_RUN:
+            return
+        if covered or self.FULL_BACKFILL or not self.watermarks.has(self.SOURCE):
+            self.watermarks.advance(self.SOURCE, newest_links)
+        else:
+            logging.info(f"{self.SOURCE} stopped before reaching known content, keeping its watermark")
+
+    async def skip_known_links(self, session, links: list) -> list:
+        """
+        Drop article links the sink already has, before fetching them. For the
+        Flask server, links its membership filter flags are confirmed with one
+        /exists request.
+        """
+        total = len(links)
+        if self.SINK != "http":
+            unknown = [link for link in links if not self.sink.has_url(link)]
+            self.stats['skipped_known'] += total - len(unknown)
+            return unknown
+        known = get_known_articles(self.SYNC_STATE_PATH, self.FLASK_SERVER_URL)
+        links = [link for link in links if not known.has_url(link)]
+        candidates = [link for link in links if known.might_have_url(link)]
+        existing = set()
+        if candidates:
+            existing = set(await self.check_exists(session, 'urls', candidates))
+            for link in existing:
+                known.urls.add(normalize_url(link))
+        unknown = [link for link in links if link not in existing]
+        self.stats['skipped_known'] += total - len(unknown)
+        return unknown
+
+    async def is_known_title(self, session, title: str) -> bool:
+        """
+        True if the Flask server already stores an article with this title,
+        though it is not in the synced titles: a membership filter hit,
+        confirmed with /exists. Checked before summarizing the article.
+        """
+        if self.SINK != "http":
+            return False
+        known = get_known_articles(self.SYNC_STATE_PATH, self.FLASK_SERVER_URL)
+        if not known.might_have_title(title):
+            return False
+        if not await self.check_exists(session, 'titles', [title]):
+            return False
+        # Shared with the scrapers' processed titles
+        known.titles.add(title)
+        return True
+
+    async def check_exists(self, session, kind: str, values: list) -> list:
+        """Ask the Flask server which of the given 'titles' or 'urls' it stores."""
+        try:
+            exists_url = self.FLASK_SERVER_URL.rstrip('/') + '/exists'
+            async with session.post(exists_url, json={kind: values}) as response:
+                if response.status == 200:
+                    return (await response.json())[kind]
+                logging.error(f"Error checking known {kind} with Flask server: HTTP {response.status}")
+        except Exception as e:
+            logging.error(f"Error checking known {kind} with Flask server: {e}")
+        return []
+
+    async def fetch_page(self, session, url: str, retries: int = 3, stale: bool = True) -> str:
+        """
+        Fetch page content with retries, within the shared request limits.
+        Throttling and server errors are retried with jittered exponential
+        backoff, other errors are not. Cached pages are revalidated with a
+        conditional request; in offline mode they are served without
+        touching the network. If every retry fails, the cached copy is
+        returned unless stale is False, as for listing pages, whose old
+        links would make pagination stop early.
+        """
+        cached = self.http_cache.get(url)
+        if self.OFFLINE:
+            self.http_cache.record_offline(cached is not None)
+            return cached.body if cached else None
+        headers = {**self.headers, **self.http_cache.conditional_headers(cached)}
+        for attempt in range(retries):
+            try:
+                async with self.limiter.slot(url) as slot:
+                    async with session.get(url, headers=headers) as response:
+                        self.stats['requests'] += 1
+                        slot.record(response.status, response.headers.get('Retry-After'))
+                        if response.status == 304 and cached:
+                            self.http_cache.touch(url)
+                            return cached.body
+                        if response.status == 200:
+                            body = await response.text()
+                            self.http_cache.put(
+                                url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                            )
+                            return body
+                        self.stats['failed_requests'] += 1
+                        logging.error(f"Error fetching {url}: HTTP {response.status}")
+                        if response.status not in RETRY_STATUSES:
+                            break
+            except Exception as e:
+                self.stats['failed_requests'] += 1
+                logging.error(f"Error fetching {url}: {e}")
+            if attempt < retries - 1:
+                await asyncio.sleep(self.limiter.backoff(attempt))
+        # Fall back to a stale copy rather than losing the page
+        return cached.body if cached and stale else None
+
+    async def post_form(self, session, url: str, payload: dict, retries: int = 3) -> str:
+        """
+        POST a form, such as a "Load more" request, and return the response body,
+        within the shared request limits. Responses are cached under the URL and
+        payload, so offline runs can be served from the cache. These are listing
+        pages, so a stale copy is not used when every retry fails.
+        """
+        key = f"POST {url}?{urlencode(sorted(payload.items()))}"
+        cached = self.http_cache.get(key)
+        if self.OFFLINE:
+            self.http_cache.record_offline(cached is not None)
+            return cached.body if cached else None
+        for attempt in range(retries):
+            try:
+                async with self.limiter.slot(url) as slot:
+                    async with session.post(url, data=payload, headers=self.headers) as response:
+                        self.stats['requests'] += 1
+                        slot.record(response.status, response.headers.get('Retry-After'))
+                        if response.status == 200:
+                            body = await response.text()
+                            self.http_cache.put(key, body)
+                            return body
+                        self.stats['failed_requests'] += 1
+                        logging.error(f"Error posting to {url}: HTTP {response.status}")
+                        if response.status not in RETRY_STATUSES:
+                            break
+            except Exception as e:
+                self.stats['failed_requests'] += 1
+                logging.error(f"Error posting to {url}: {e}")
+            if attempt < retries - 1:
+                await asyncio.sleep(self.limiter.backoff(attempt))
         return None
 
+    async def parse_html(self, content: str) -> BeautifulSoup:
+        """Parse HTML in the parse thread pool so the event loop keeps serving other requests."""
+        return await run_in_pool(self.soup_executor, BeautifulSoup, content, soup_features())
+
+    async def extract_fields(self, content: str, selectors: dict) -> dict:
+        """Extract the selected fields of an article page in the parse pool."""
+        return await run_in_pool(self.parse_executor, extract_fields, self.EXTRACT_BACKEND, content, selectors)
+
     async def summarize_content(self, content: str) -> str:
         """Summarize the given content."""
+        if not self.SUMMARIZE:
+            if len(content) <= self.LEAD_CHARS:
+                return content
+            return content[:self.LEAD_CHARS].rsplit(' ', 1)[0] + '...'
         try:
-            if len(content) > 1024:
-                content = content[:1024]
-            summary = self.summarizer(content, max_length=130, min_length=50, do_sample=False)
-            return summary[0]["summary_text"]
+            params = {'max_length': self.summary_queue.max_length, 'min_length': self.summary_queue.min_length}
+            if self.summary_queue.max_chunks > 1:
+                params['max_chunks'] = self.summary_queue.max_chunks
+            key = self.summary_cache.make_key(content, self.summarizer.name, **params)
+            summary = self.summary_cache.get(key)
+            if summary is None:
+                summary = await self.summary_queue.submit(content)
+                self.summary_cache.put(key, summary)
+            return summary
         except Exception as e:
             print(f"Summarization failed: {e}")
             return "Could not summarize content."
 
-    def save_to_flask_server(self, articles: list, processed_titles: set):
+    async def save_articles(self, articles: list, processed_titles: set):
         """
-        Save a list of articles to the Flask server.
+        Queue a list of articles for the sink. Their URLs are marked done in the
+        frontier once the sink has stored them, or failed if it could not.
         :param articles: List of article dictionaries.
         :param processed_titles: Set of already processed article titles.
         """
         if not articles:
             return
-        for article in articles:
-            if article and article['Title'] not in processed_titles:
-                try:
-                    response = requests.post(self.FLASK_SERVER_URL, json=article)
-                    if response.status_code == 201:
-                        processed_titles.add(article['Title'])
-                    elif response.status_code == 409:
-                        logging.warning(f"Conflict error saving article to Flask server: {response.status_code}")
-                    else:
-                        logging.error(f"Error saving article to Flask server: {response.status_code}")
-                except Exception as e:
-                    logging.error(f"Failed to connect to Flask server: {e}")
\ No newline at end of file
+        self.stats['articles'] += len(articles)
+        if self.DRY_RUN:
+            for article in articles:
+                logging.info(f"Dry run, not saving: {article['Title']} ({article['URL']})")
+            return
+        await self.sink.submit(articles, processed_titles, self.stats, self.frontier)
+
+    async def flush_articles(self):
+        """Write or upload any articles still waiting in the sink's buffer."""
+        await self.sink.flush()
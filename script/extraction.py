@@ -0,0 +1,176 @@
+# Path: extraction.py
+import logging
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+from workers import get_shared
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    # Beautiful Soup 4.13+ decides which tags to build through ElementFilter
+    from bs4.filter import ElementFilter
+except ImportError:
+    ElementFilter = None
+
+_COMPOUND = re.compile(r'^([\w-]*)((?:[.#][\w-]+)*)$')
+
+
+def soup_features() -> str:
+    """Fastest tree builder available to BeautifulSoup."""
+    return 'lxml' if HAS_LXML else 'html.parser'
+
+
+class _Anchor:
+    """First compound of a CSS selector (tag.class#id), used to decide which regions to parse."""
+
+    def __init__(self, selector: str):
+        compound = selector.split()[0]
+        match = _COMPOUND.match(compound)
+        if not match:
+            raise ValueError(f"Unsupported selector for region parsing: {selector}")
+        self.tag = match.group(1) or None
+        self.classes = set(re.findall(r'\.([\w-]+)', match.group(2)))
+        ids = re.findall(r'#([\w-]+)', match.group(2))
+        self.id = ids[0] if ids else None
+
+    def matches(self, name: str, attrs) -> bool:
+        if self.tag and name != self.tag:
+            return False
+        attrs = attrs or {}
+        if self.id and attrs.get('id') != self.id:
+            return False
+        if self.classes:
+            classes = attrs.get('class') or ''
+            if isinstance(classes, str):
+                classes = classes.split()
+            if not self.classes.issubset(classes):
+                return False
+        return True
+
+
+def region_filter(selectors: dict):
+    """
+    Build a parse_only filter that keeps only the page regions the selectors can match.
+    Returns None if some selector cannot be anchored, in which case the whole page is parsed.
+    """
+    try:
+        anchors = [_Anchor(selector) for selector in selectors.values()]
+    except ValueError as e:
+        logging.warning(e)
+        return None
+
+    def keep(name, attrs=None):
+        return any(anchor.matches(name, attrs) for anchor in anchors)
+
+    if ElementFilter is None:
+        # Older releases pass the tag's name and attributes to a callable name
+        return SoupStrainer(keep)
+
+    class RegionFilter(ElementFilter):
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return keep(name, attrs)
+
+        def allow_string_creation(self, string):
+            return False
+
+    return RegionFilter()
+
+
+def _clean(text: str) -> str:
+    """Collapse runs of whitespace, so text nodes split by inline tags keep one space between words."""
+    return ' '.join(text.split())
+
+
+class SoupExtractor:
+    """Extract fields with BeautifulSoup, optionally building only the regions the selectors need."""
+
+    def __init__(self, features: str, restrict: bool = True):
+        self.features = features
+        self.restrict = restrict
+        self._filters = {}
+
+    def _filter_for(self, selectors: dict):
+        key = tuple(sorted(selectors.items()))
+        if key not in self._filters:
+            self._filters[key] = region_filter(selectors) if self.restrict else None
+        return self._filters[key]
+
+    def extract(self, html: str, selectors: dict) -> dict:
+        """
+        Return {field: text} for each {field: CSS selector}. The 'content' field joins
+        the text of every match; other fields take the first match. Missing fields are None.
+        """
+        soup = BeautifulSoup(html, self.features, parse_only=self._filter_for(selectors))
+        fields = {}
+        for field, selector in selectors.items():
+            if field == 'content':
+                texts = [_clean(tag.get_text(' ')) for tag in soup.select(selector)]
+                fields[field] = ' '.join(text for text in texts if text) or None
+            else:
+                tag = soup.select_one(selector)
+                fields[field] = (_clean(tag.get_text(' ')) or None) if tag else None
+        return fields
+
+
+class SelectolaxExtractor:
+    """Extract fields with selectolax, whose C parser is fast enough to parse whole pages."""
+
+    def extract(self, html: str, selectors: dict) -> dict:
+        tree = HTMLParser(html)
+        fields = {}
+        for field, selector in selectors.items():
+            if field == 'content':
+                texts = [_clean(node.text(separator=' ')) for node in tree.css(selector)]
+                fields[field] = ' '.join(text for text in texts if text) or None
+            else:
+                node = tree.css_first(selector)
+                fields[field] = (_clean(node.text(separator=' ')) or None) if node else None
+        return fields
+
+
+def available_backends() -> list:
+    """Names of the extraction backends usable in this environment."""
+    backends = ['html.parser']
+    if HAS_LXML:
+        backends.append('lxml')
+    if HTMLParser is not None:
+        backends.append('selectolax')
+    return backends
+
+
+def _create(name: str):
+    if name == 'html.parser':
+        # The original behaviour: pure-Python parser over the whole page
+        return SoupExtractor('html.parser', restrict=False)
+    if name == 'lxml':
+        return SoupExtractor('lxml', restrict=True)
+    if name == 'selectolax':
+        return SelectolaxExtractor()
+    raise ValueError(f"Unknown extraction backend: {name}")
+
+
+def get_extractor(name: str = 'lxml'):
+    """Return the named extractor, falling back to html.parser if its library is not installed."""
+    if name not in available_backends():
+        if name not in ('lxml', 'selectolax'):
+            raise ValueError(f"Unknown extraction backend: {name}")
+        logging.warning(f"Extraction backend {name} is not installed, using html.parser")
+        name = 'html.parser'
+    return get_shared(f"extractor:{name}", _create, name)
+
+
+def extract_fields(name: str, html: str, selectors: dict) -> dict:
+    """
+    Extract fields with the named backend's extractor. A plain function, so it
+    can run in a process pool, where each worker keeps its own extractor.
+    """
+    return get_extractor(name).extract(html, selectors)
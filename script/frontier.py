@@ -0,0 +1,127 @@
+# Path: frontier.py
+import sqlite3
+import threading
+import time
+from collections import Counter
+from membership import normalize_url
+from workers import get_shared
+
+QUEUED = 'queued'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Frontier:
+    """
+    Persistent record of every article URL a source has discovered and what
+    became of it: queued, in flight, done, or failed with a retry count.
+    Done URLs are never fetched again; failed ones are retried on later runs
+    until they have failed max_retries times.
+    """
+
+    def __init__(self, path: str, max_retries: int = 3):
+        self.path = path
+        self.max_retries = max_retries
+        self.skipped = 0
+        # Answer lookups but record nothing, e.g. for dry runs
+        self.read_only = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " url TEXT PRIMARY KEY,"
+            " source TEXT NOT NULL,"
+            " link TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " retries INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_urls_source_state ON urls (source, state)")
+        self._conn.commit()
+
+    def _set_state(self, links: list, state: str):
+        if self.read_only:
+            return
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE urls SET state = ?, updated_at = ? WHERE url = ?",
+            [(state, now, normalize_url(link)) for link in links],
+        )
+
+    def admit(self, source: str, links: list) -> list:
+        """
+        Queue newly discovered links and return those still worth fetching:
+        new ones and earlier failures with retries left. Done links are dropped.
+        """
+        admitted = []
+        with self._lock:
+            now = time.time()
+            for link in links:
+                key = normalize_url(link)
+                row = self._conn.execute("SELECT state, retries FROM urls WHERE url = ?", (key,)).fetchone()
+                if row is None:
+                    if self.read_only:
+                        admitted.append(link)
+                        continue
+                    self._conn.execute(
+                        "INSERT INTO urls (url, source, link, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, source, link, QUEUED, now),
+                    )
+                elif row[0] == DONE or (row[0] == FAILED and row[1] >= self.max_retries):
+                    self.skipped += 1
+                    continue
+                admitted.append(link)
+            self._conn.commit()
+        return admitted
+
+    def is_done(self, link: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM urls WHERE url = ?", (normalize_url(link),)).fetchone()
+        return row is not None and row[0] == DONE
+
+    def pending(self, source: str) -> list:
+        """Links left over from earlier runs: still queued, interrupted in flight, or failed with retries left."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT link FROM urls WHERE source = ? AND (state IN (?, ?) OR (state = ? AND retries < ?)) "
+                "ORDER BY updated_at",
+                (source, QUEUED, IN_FLIGHT, FAILED, self.max_retries),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def start(self, link: str):
+        with self._lock:
+            self._set_state([link], IN_FLIGHT)
+            self._conn.commit()
+
+    def done(self, links: list):
+        """Mark links finished: ingested, or found not worth ingesting."""
+        with self._lock:
+            self._set_state(links, DONE)
+            self._conn.commit()
+
+    def fail(self, link: str):
+        if self.read_only:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE urls SET state = ?, retries = retries + 1, updated_at = ? WHERE url = ?",
+                (FAILED, time.time(), normalize_url(link)),
+            )
+            self._conn.commit()
+
+    def report(self) -> str:
+        with self._lock:
+            counts = Counter(dict(self._conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state").fetchall()))
+        return (f"Frontier: {self.skipped} links skipped, {counts[DONE]} done, {counts[FAILED]} failed, "
+                f"{counts[QUEUED] + counts[IN_FLIGHT]} pending")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_frontier(path: str = 'frontier.db', max_retries: int = 3) -> Frontier:
+    """Return the process-wide frontier, opened on first call."""
+    return get_shared("frontier", Frontier, path, max_retries)
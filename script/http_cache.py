@@ -0,0 +1,115 @@
+# Path: http_cache.py
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from workers import get_shared
+
+CachedPage = namedtuple('CachedPage', ['body', 'etag', 'last_modified', 'fetched_at'])
+
+
+class HttpCache:
+    """
+    On-disk cache of fetched pages with their ETag / Last-Modified validators.
+    Cached pages are revalidated with conditional requests and their body is
+    reused on 304. Least recently used pages are evicted past max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.revalidated = 0
+        self.downloaded = 0
+        self.offline_hits = 0
+        self.offline_misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " body TEXT NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_used ON pages (last_used)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def get(self, url: str):
+        """Return the cached page for a URL, or None. A hit counts as use for eviction."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row:
+                self._conn.execute("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), url))
+                self._conn.commit()
+        return CachedPage(*row) if row else None
+
+    def conditional_headers(self, page: CachedPage) -> dict:
+        """Request headers that let the server answer 304 if the cached page is current."""
+        headers = {}
+        if page and page.etag:
+            headers['If-None-Match'] = page.etag
+        if page and page.last_modified:
+            headers['If-Modified-Since'] = page.last_modified
+        return headers
+
+    def touch(self, url: str):
+        """Record a successful revalidation (304) of a cached page."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("UPDATE pages SET fetched_at = ?, last_used = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+            self.revalidated += 1
+
+    def put(self, url: str, body: str, etag: str = None, last_modified: str = None):
+        """Store a freshly downloaded page."""
+        size = len(body.encode('utf-8'))
+        with self._lock:
+            now = time.time()
+            old = self._conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched_at, last_used, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, size),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            self.downloaded += 1
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        evicted = 0
+        rows = self._conn.execute("SELECT url, size FROM pages ORDER BY last_used ASC").fetchall()
+        for url, size in rows:
+            if self._bytes <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._bytes -= size
+            evicted += 1
+        logging.info(f"Evicted {evicted} pages from {self.path}")
+
+    def record_offline(self, hit: bool):
+        if hit:
+            self.offline_hits += 1
+        else:
+            self.offline_misses += 1
+
+    def report(self) -> str:
+        reused = self.revalidated + self.offline_hits
+        total = reused + self.downloaded + self.offline_misses
+        rate = reused / total * 100 if total else 0
+        return (f"HTTP cache: {self.revalidated} revalidated (304), {self.downloaded} downloaded, "
+                f"{self.offline_hits} offline hits, {self.offline_misses} offline misses "
+                f"({rate:.0f}% served from cache), {self._bytes / (1024 * 1024):.1f} MB")
+
+
+def get_http_cache(path: str = 'http_cache.db', max_bytes: int = 256 * 1024 * 1024) -> HttpCache:
+    """Return the process-wide HTTP cache, opened on first call."""
+    return get_shared("http_cache", HttpCache, path, max_bytes)
@@ -0,0 +1,167 @@
+# Path: ingest.py
+import asyncio
+import logging
+import aiohttp
+from workers import get_shared
+
+# Responses worth retrying: rate limiting and server-side errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Per-item results of the bulk endpoint, mapped to the status codes of POST /data
+BULK_STATUSES = {'created': 201, 'conflict': 409, 'invalid': 400}
+
+
+def mark_done(frontier, article: dict):
+    """Record in the frontier that an article's URL is in the sink."""
+    if frontier is not None and article.get('URL'):
+        frontier.done([article['URL']])
+
+
+def mark_failed(frontier, article: dict):
+    """Record in the frontier that an article could not be stored, so a later run retries its URL."""
+    if frontier is not None and article.get('URL'):
+        frontier.fail(article['URL'])
+
+
+class IngestClient:
+    """
+    Uploads articles to the Flask server. Articles are buffered and each
+    batch is sent in one request to the bulk endpoint, over a keep-alive
+    connection pool shared by all scrapers.
+    """
+
+    def __init__(self, url: str, batch_size: int = 10, max_connections: int = 4,
+                 retries: int = 3, backoff: float = 1.0, timeout: int = 30):
+        self.url = url
+        self.bulk_url = url.rstrip('/') + '/bulk'
+        # Switched off if the server has no bulk endpoint
+        self.use_bulk = True
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.uploaded = 0
+        self.conflicts = 0
+        self.failed = 0
+        self._loop = None
+        self._session = None
+        self._buffer = []
+        self._pending_titles = set()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The connection pool belongs to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._loop = loop
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def submit(self, articles: list, processed_titles: set, stats=None, frontier=None):
+        """
+        Buffer articles for upload, flushing once a full batch is waiting.
+        :param articles: List of article dictionaries.
+        :param processed_titles: Set of already processed article titles; updated on success.
+        :param stats: Optional Counter of the submitting scraper.
+        :param frontier: Optional Frontier; each article's URL is marked done or failed once its upload settles.
+        """
+        for article in articles:
+            if not article:
+                continue
+            title = article['Title']
+            if title in processed_titles or title in self._pending_titles:
+                # The server has it, or will once the pending upload lands
+                mark_done(frontier, article)
+                continue
+            self._pending_titles.add(title)
+            self._buffer.append((article, processed_titles, stats, frontier))
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        """Upload everything in the buffer."""
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        statuses = await self._post_bulk([article for article, _, _, _ in batch])
+        if statuses is None:
+            statuses = await asyncio.gather(*(self._post(article) for article, _, _, _ in batch))
+        for (article, processed_titles, stats, frontier), status in zip(batch, statuses):
+            self._pending_titles.discard(article['Title'])
+            self._record(article, processed_titles, stats, frontier, status)
+
+    def _record(self, article: dict, processed_titles: set, stats, frontier, status):
+        if status == 201:
+            processed_titles.add(article['Title'])
+            self.uploaded += 1
+            if stats is not None:
+                stats['saved'] += 1
+            mark_done(frontier, article)
+        elif status == 409:
+            self.conflicts += 1
+            logging.warning(f"Conflict error saving article to Flask server: {status}")
+            mark_done(frontier, article)
+        else:
+            self.failed += 1
+            logging.error(f"Error saving article to Flask server: {status}")
+            mark_failed(frontier, article)
+
+    async def _request(self, url: str, payload):
+        """POST a JSON payload, retrying transient failures with exponential backoff."""
+        session = self._get_session()
+        status, body = None, None
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.post(url, json=payload) as response:
+                    status = response.status
+                    body = await response.json(content_type=None) if status == 200 else None
+                    if status not in RETRY_STATUSES:
+                        return status, body
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logging.error(f"Failed to connect to Flask server: {e}")
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        return status, body
+
+    async def _post(self, article: dict):
+        """POST one article and return the response status."""
+        status, _ = await self._request(self.url, article)
+        return status
+
+    async def _post_bulk(self, articles: list):
+        """
+        Upload a batch in one request. Returns one status per article, or None
+        if the server has no bulk endpoint.
+        """
+        if not self.use_bulk:
+            return None
+        status, body = await self._request(self.bulk_url, articles)
+        if status in (404, 405):
+            logging.warning("Flask server has no bulk endpoint, uploading articles one by one")
+            self.use_bulk = False
+            return None
+        if status != 200 or not body:
+            return [status] * len(articles)
+        statuses = [None] * len(articles)
+        for result in body.get('results', []):
+            statuses[result['index']] = BULK_STATUSES.get(result['status'])
+        return statuses
+
+    async def close(self):
+        """Flush the remaining articles and close the connection pool."""
+        await self.flush()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def report(self) -> str:
+        return f"Uploads: {self.uploaded} created, {self.conflicts} conflicts, {self.failed} failed"
+
+
+def get_ingest_client(url: str, batch_size: int = 10, max_connections: int = 4,
+                      retries: int = 3) -> IngestClient:
+    """Return the process-wide ingest client, created on first call."""
+    return get_shared("ingest_client", IngestClient, url, batch_size, max_connections, retries)
@@ -0,0 +1,194 @@
+# Path: limits.py
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from workers import get_shared
+
+# Responses that mean the host wants us to slow down
+THROTTLE_STATUSES = {429, 503}
+# A host is slowed down once its average latency exceeds its best latency by this factor
+LATENCY_SLOWDOWN = 3.0
+# Fraction by which a host's rate grows after each healthy response
+RATE_STEP = 0.1
+
+
+def parse_retry_after(value: str):
+    """Seconds to wait from a Retry-After header (delay in seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostRate:
+    """
+    Token bucket for one host. Its rate creeps up while the host answers
+    quickly, and is halved on throttling, server errors and failed requests.
+    Retry-After pauses the host entirely.
+    """
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, burst: int):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.latency = None
+        self.best_latency = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def delay(self) -> float:
+        """Seconds until the next request may start; takes a token and returns 0 when it may start now."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def on_response(self, status: int, latency: float, retry_after: float = None):
+        self.requests += 1
+        if status in THROTTLE_STATUSES:
+            self.throttled += 1
+            self._slow_down()
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            return
+        if status >= 500:
+            self.errors += 1
+            self._slow_down()
+            return
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+        if self.latency > LATENCY_SLOWDOWN * self.best_latency:
+            self._slow_down(0.9)
+        else:
+            self.rate = min(self.max_rate, self.rate * (1 + RATE_STEP))
+
+    def on_error(self):
+        self.requests += 1
+        self.errors += 1
+        self._slow_down()
+
+    def _slow_down(self, factor: float = 0.5):
+        self.rate = max(self.min_rate, self.rate * factor)
+        # Drop any saved-up burst so the lower rate applies right away
+        self.tokens = min(self.tokens, 0.0)
+
+
+class Slot:
+    """A request admitted by the limiter; report its outcome with record()."""
+
+    def __init__(self, host: HostRate, max_retry_after: float):
+        self.host = host
+        self.max_retry_after = max_retry_after
+        self.start = time.monotonic()
+        self.recorded = False
+
+    def record(self, status: int, retry_after: str = None):
+        """Feed the response status and Retry-After header back into the host's rate."""
+        self.recorded = True
+        wait = parse_retry_after(retry_after)
+        if wait is not None:
+            wait = min(wait, self.max_retry_after)
+        self.host.on_response(status, time.monotonic() - self.start, wait)
+
+
+class RequestLimiter:
+    """
+    Caps the number of in-flight HTTP requests, overall and per host, and
+    paces each host with an adaptive token bucket (see HostRate).
+    """
+
+    def __init__(self, max_requests: int = 16, max_per_host: int = 4, rate: float = 2.0,
+                 min_rate: float = 0.2, max_rate: float = 10.0, max_retry_after: float = 120.0,
+                 backoff: float = 1.0, max_backoff: float = 30.0):
+        self.max_requests = max_requests
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_retry_after = max_retry_after
+        self.backoff_base = backoff
+        self.max_backoff = max_backoff
+        self._loop = None
+        self._global = None
+        self._hosts = {}
+        # Learned rates outlive the event loop
+        self._rates = {}
+
+    def _bind(self):
+        # Semaphores belong to the running event loop, so recreate them for a new loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_requests)
+            self._hosts = {}
+
+    def host_rate(self, url: str) -> HostRate:
+        host = urlparse(url).netloc
+        rate = self._rates.get(host)
+        if rate is None:
+            rate = self._rates[host] = HostRate(self.rate, self.min_rate, self.max_rate, self.max_per_host)
+        return rate
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Wait for a free global and per-host slot and for the host's rate to allow a request."""
+        self._bind()
+        host = urlparse(url).netloc
+        host_semaphore = self._hosts.get(host)
+        if host_semaphore is None:
+            host_semaphore = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        rate = self.host_rate(url)
+        async with host_semaphore:
+            while True:
+                delay = rate.delay()
+                if not delay:
+                    break
+                await asyncio.sleep(delay)
+            async with self._global:
+                slot = Slot(rate, self.max_retry_after)
+                try:
+                    yield slot
+                except Exception:
+                    if not slot.recorded:
+                        rate.on_error()
+                    raise
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt + 1: exponential with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * 2 ** attempt))
+
+    def report(self) -> str:
+        lines = [
+            f"  {host}: {rate.rate:.1f} req/s, {rate.requests} requests, "
+            f"{rate.throttled} throttled, {rate.errors} errors"
+            for host, rate in sorted(self._rates.items())
+        ]
+        return "Host rate limits:\n" + "\n".join(lines) if lines else "Host rate limits: no requests"
+
+
+def get_request_limiter(max_requests: int = 16, max_per_host: int = 4, **rate_settings) -> RequestLimiter:
+    """Return the process-wide request limiter, created on first call."""
+    return get_shared("request_limiter", RequestLimiter, max_requests, max_per_host, **rate_settings)
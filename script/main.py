@@ -1,6 +1,52 @@
 # Path: main.py
+import time
+
+_start = time.perf_counter()
+
+import argparse
 import asyncio
-from scrapers import run_scrapers
+from config import NewsScraperConfig
+from scrapers import SOURCES, run_scrapers
+from sinks import SINKS
+
+# The summarization model and its libraries are imported only when the first summary is needed
+IMPORT_SECONDS = time.perf_counter() - _start
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape cybersecurity news, summarize it and upload it to the Flask server.")
+    parser.add_argument('--source', action='append', choices=sorted(SOURCES), dest='sources',
+                        help="Source to scrape; repeat for several (default: all)")
+    parser.add_argument('--max-pages', type=positive_int, help="Listing pages to walk per source (default: per scraper)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Scrape without uploading or recording progress (watermarks, URL frontier)")
+    parser.add_argument('--no-summarize', action='store_true',
+                        help="Don't load the summarization model; use each article's opening as its summary")
+    parser.add_argument('--sink', choices=SINKS,
+                        help="Send articles to the Flask server (http) or a local jsonl/sqlite file (default: config)")
+    parser.add_argument('--offline', action='store_true', help="Serve pages only from the HTTP cache")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    NewsScraperConfig.DRY_RUN = args.dry_run
+    NewsScraperConfig.SUMMARIZE = not args.no_summarize
+    NewsScraperConfig.OFFLINE = args.offline
+    if args.sink:
+        NewsScraperConfig.SINK = args.sink
+    print(f"Imports took {IMPORT_SECONDS:.2f}s")
+    start = time.perf_counter()
+    asyncio.run(run_scrapers(args.sources, args.max_pages))
+    print(f"Total run time {time.perf_counter() - _start:.1f}s ({time.perf_counter() - start:.1f}s scraping)")
+
 
 if __name__ == "__main__":
-    asyncio.run(run_scrapers())
\ No newline at end of file
+    main()
@@ -1,4 +1,6 @@
 import asyncio
+import logging
+import time
 from .bleepingcomputer import BleepingComputerScraper
 from .cyberscoop import CyberscoopScraper
 from .krebsonsecurity import KrebsonSecurityScraper
@@ -11,23 +13,85 @@ __all__ = [
     "CyberscoopScraper"
 ]
 
-async def run_scrapers():
-    # Initialize the scrapers
-    scrapers = [
-        BleepingComputerScraper(),
-        CyberscoopScraper(),
-        KrebsonSecurityScraper(),
-        ThreatPostScraper()
-    ]
-
-    # Run the scrapers one by one and show which one is currently working
-    for scraper in scrapers:
-        print(f"Starting scraper for {scraper.config.SOURCE}...")
-        try:
-            await scraper.run(scraper.config.SOURCE)  # Assuming each scraper has an async 'run' method
-            print(f"Scraper {scraper.config.SOURCE} completed successfully")
-        except Exception as e:
-            print(f"Scraper {scraper.config.SOURCE} failed with exception: {e}")
+SCRAPERS = [
+    BleepingComputerScraper,
+    CyberscoopScraper,
+    KrebsonSecurityScraper,
+    ThreatPostScraper,
+]
+
+# Scrapers by short name (their module name), for selecting sources on the command line
+SOURCES = {scraper_class.__module__.rsplit('.', 1)[-1]: scraper_class for scraper_class in SCRAPERS}
+
+async def run_scraper(scraper, max_pages: int = None) -> dict:
+    """Run one scraper, catching its errors so the other sources keep going."""
+    source = scraper.config.SOURCE
+    print(f"Starting scraper for {source}...")
+    start = time.perf_counter()
+    try:
+        await scraper.run(source, max_pages)
+        status = "ok"
+        print(f"Scraper {source} completed successfully")
+    except Exception as e:
+        status = f"failed: {e}"
+        logging.error(f"Scraper {source} failed: {e}")
+        print(f"Scraper {source} failed with exception: {e}")
+    return {
+        'source': source,
+        'status': status,
+        'seconds': time.perf_counter() - start,
+        **scraper.config.stats,
+    }
+
+def print_report(results: list):
+    print(f"{'Source':<50} {'Status':<8} {'Time':>8} {'Requests':>9} {'Articles':>9} {'Saved':>6}")
+    for result in results:
+        print(
+            f"{result['source']:<50} {result['status'][:8]:<8} {result['seconds']:>7.1f}s "
+            f"{result.get('requests', 0):>9} {result.get('articles', 0):>9} {result.get('saved', 0):>6}"
+        )
+
+async def run_scrapers(sources: list = None, max_pages: int = None):
+    """
+    Run the scrapers of the given sources (names from SOURCES; all by default) concurrently.
+    :param max_pages: Listing pages per source, instead of each scraper's MAX_PAGES.
+    """
+    scraper_classes = [SOURCES[name] for name in sources] if sources else SCRAPERS
+    # Initialize the scrapers; their constructors query the Flask server, so build them in threads
+    loop = asyncio.get_running_loop()
+    created = await asyncio.gather(
+        *(loop.run_in_executor(None, scraper_class) for scraper_class in scraper_classes),
+        return_exceptions=True,
+    )
+    scrapers = []
+    for scraper_class, scraper in zip(scraper_classes, created):
+        if isinstance(scraper, Exception):
+            logging.error(f"Could not start {scraper_class.__name__}: {scraper}")
+            print(f"Could not start {scraper_class.__name__}: {scraper}")
+        else:
+            scrapers.append(scraper)
+    if not scrapers:
+        # Nothing ran, so the shared sink, queue and caches were never set up
+        print("No scrapers started.")
+        return
+
+    # Run all scrapers concurrently; request limits are shared through NewsScraperConfig
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_scraper(scraper, max_pages) for scraper in scrapers))
+    print_report(results)
+    print(f"All scrapers finished in {time.perf_counter() - start:.1f}s")
+
+    # The scrapers share these, so any one config holds the process-wide instances
+    config = scrapers[0].config
+    await config.summary_queue.close()
+    await config.sink.close()
+    print(config.sink.report())
+    print(config.summary_queue.report())
+    print(config.summarizer.report())
+    print(config.summary_cache.report())
+    print(config.http_cache.report())
+    print(config.frontier.report())
+    print(config.limiter.report())
 
 if __name__ == "__main__":
     asyncio.run(run_scrapers())
\ No newline at end of file
@@ -0,0 +1,65 @@
+# Path: scrapers/base.py
+import aiohttp
+import logging
+from config import NewsScraperConfig
+from .engine import CrawlEngine
+
+
+class BaseScraper:
+    """
+    Common plumbing for the source scrapers. Subclasses set SOURCE and
+    SELECTORS and implement discover(); CrawlEngine does the rest.
+    """
+    SOURCE = None
+    # CSS selectors of an article page's 'title', 'date' and 'content'
+    SELECTORS = {}
+    # Listing pages walked per run
+    MAX_PAGES = 1
+
+    def __init__(self):
+        self.config = NewsScraperConfig(source=self.SOURCE)
+        self.session = None
+        self.processed_titles = set()
+        self.init_processed_titles()
+
+    def init_processed_titles(self):
+        # Fetch existing articles to avoid reprocessing
+        self.processed_titles = self.config.load_processed_titles()
+
+    async def init_session(self):
+        if not self.session:
+            timeout = aiohttp.ClientTimeout(total=self.config.TIMEOUT)
+            self.session = aiohttp.ClientSession(timeout=timeout)
+
+    async def close_session(self):
+        if self.session:
+            await self.session.close()
+
+    async def fetch_page(self, url: str, retries: int = 3) -> str:
+        # Fetch page content with retries
+        return await self.config.fetch_page(self.session, url, retries)
+
+    async def fetch_listing(self, url: str, retries: int = 3) -> str:
+        # Listing pages are never served stale: old links would end pagination early
+        return await self.config.fetch_page(self.session, url, retries, stale=False)
+
+    async def discover(self, start_url: str, max_pages: int):
+        """Async generator yielding the article links of each listing page, newest first."""
+        raise NotImplementedError
+        yield
+
+    def extract_article(self, fields: dict) -> tuple:
+        """Return (title, date, content) from the fields matched by SELECTORS; override to clean them up."""
+        return fields.get('title'), fields.get('date'), fields.get('content')
+
+    async def run(self, start_url: str, max_pages: int = None):
+        await self.init_session()
+        if max_pages is None:
+            max_pages = self.MAX_PAGES
+        # Errors reach the caller after the buffered articles are flushed, so a dead source is reported as failed
+        try:
+            await CrawlEngine(self).run(start_url, max_pages)
+            logging.info(f"{self.config.SOURCE} Scraping completed.")
+        finally:
+            await self.config.flush_articles()
+            await self.close_session()
@@ -0,0 +1,153 @@
+# Path: scrapers/engine.py
+import asyncio
+import logging
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class CrawlEngine:
+    """
+    Runs one scraper as a pipeline of concurrent stages:
+    discover links -> fetch -> extract -> classify -> summarize -> store.
+    Stages are connected by bounded queues, so articles flow through one by
+    one and a slow stage holds back the ones before it instead of piling up work.
+    """
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.config = scraper.config
+        self.frontier = scraper.config.frontier
+        self.seen_links = set()
+
+    async def run(self, start_url: str, max_pages: int):
+        config = self.config
+        stages = [
+            (self.fetch, config.FETCH_CONCURRENCY),
+            (self.extract, config.EXTRACT_CONCURRENCY),
+            (self.classify, 1),
+            (self.summarize, config.SUMMARIZE_CONCURRENCY),
+            (self.store, 1),
+        ]
+        queues = [asyncio.Queue(maxsize=config.STAGE_QUEUE_SIZE) for _ in stages]
+
+        async def run_stage(index: int, handler, workers: int):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+
+            async def worker():
+                while True:
+                    item = await inbox.get()
+                    if item is _DONE:
+                        return
+                    try:
+                        result = await handler(item)
+                    except Exception as e:
+                        logging.error(f"{handler.__name__} failed for {item['url']}: {e}")
+                        self.frontier.fail(item['url'])
+                        continue
+                    if result is not None and outbox is not None:
+                        await outbox.put(result)
+
+            await asyncio.gather(*(worker() for _ in range(workers)))
+            if outbox is not None:
+                for _ in range(stages[index + 1][1]):
+                    await outbox.put(_DONE)
+
+        async def run_discovery():
+            try:
+                await self.discover(queues[0], start_url, max_pages)
+            finally:
+                for _ in range(stages[0][1]):
+                    await queues[0].put(_DONE)
+
+        # Let every stage drain before reporting a failure
+        results = await asyncio.gather(
+            run_discovery(),
+            *(run_stage(index, handler, workers) for index, (handler, workers) in enumerate(stages)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    async def discover(self, outbox: asyncio.Queue, start_url: str, max_pages: int):
+        """Feed new article links from the scraper's listing pages, stopping at known content."""
+        # Links an earlier run queued but did not finish go first
+        await self.enqueue(outbox, self.frontier.pending(self.config.SOURCE))
+        pages = self.scraper.discover(start_url, max_pages)
+        newest_links = None
+        page_count = 0
+        reached_known = False
+        try:
+            async for links in pages:
+                page_count += 1
+                if newest_links is None:
+                    newest_links = links
+                await self.enqueue(outbox, links)
+                if self.config.reached_known_content(links):
+                    logging.info("Reached already-ingested articles, stopping pagination.")
+                    reached_known = True
+                    break
+        finally:
+            await pages.aclose()
+        if not newest_links:
+            # The first listing page could not be fetched or had no article links
+            raise RuntimeError(f"No article links found at {start_url}")
+        # Scrapers raise when a listing page fails, so fewer than max_pages pages means the listing ended
+        self.config.advance_watermark(newest_links, reached_known or page_count < max_pages)
+
+    async def enqueue(self, outbox: asyncio.Queue, links: list):
+        """Send on links not yet seen this run, not done in the frontier and not on the server."""
+        new_links = [link for link in links if link not in self.seen_links]
+        self.seen_links.update(new_links)
+        new_links = self.frontier.admit(self.config.SOURCE, new_links)
+        unknown = await self.config.skip_known_links(self.scraper.session, new_links)
+        self.frontier.done(list(set(new_links) - set(unknown)))
+        for link in unknown:
+            await outbox.put({'url': link})
+
+    async def fetch(self, item):
+        self.frontier.start(item['url'])
+        item['html'] = await self.scraper.fetch_page(item['url'])
+        if not item['html']:
+            self.frontier.fail(item['url'])
+            return None
+        return item
+
+    async def extract(self, item):
+        fields = await self.config.extract_fields(item.pop('html'), self.scraper.SELECTORS)
+        title, date, text = self.scraper.extract_article(fields)
+        if (not all([title, date, text]) or title in self.scraper.processed_titles
+                or await self.config.is_known_title(self.scraper.session, title)):
+            # Nothing to ingest from this page; don't fetch it again
+            self.frontier.done([item['url']])
+            return None
+        item.update(title=title, date=date, content=text)
+        return item
+
+    async def classify(self, item):
+        item['category'] = self.config.classify_content(item['content'])
+        if not item['category']:
+            # Not dropped for good: the page is retried on later runs, e.g. after keywords are added
+            logging.info(f"No attack type matched {item['url']}")
+            self.config.stats['unclassified'] += 1
+            self.frontier.fail(item['url'])
+            return None
+        return item
+
+    async def summarize(self, item):
+        item['summary'] = await self.config.summarize_content(item['content'])
+        return item
+
+    async def store(self, item):
+        article = {
+            'Title': item['title'],
+            'Date': item['date'],
+            'Category': item['category'],
+            'Summary': item['summary'],
+            'Source': self.config.SOURCE,
+            'URL': item['url'],
+        }
+        # The sink marks the URL done or failed in the frontier once the article is stored
+        await self.config.save_articles([article], self.scraper.processed_titles)
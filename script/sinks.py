@@ -0,0 +1,216 @@
+# Path: sinks.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from ingest import get_ingest_client, mark_done, mark_failed
+from membership import normalize_url
+from workers import get_shared
+
+SINKS = ("http", "jsonl", "sqlite")
+
+
+class LocalSink:
+    """
+    Writes articles on this machine, so the crawler can run without the Flask
+    server. Articles are buffered and written batch_size at a time; titles and
+    URLs already in the output are skipped.
+    """
+    name = "Local sink"
+
+    def __init__(self, path: str, batch_size: int = 10):
+        self.path = path
+        self.batch_size = batch_size
+        self.written = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.titles = set()
+        self.urls = set()
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        """Load the titles and URLs already written."""
+        raise NotImplementedError
+
+    def _write(self, articles: list):
+        """Write a batch of new articles. Runs in a worker thread."""
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def has_url(self, link: str) -> bool:
+        return normalize_url(link) in self.urls
+
+    async def submit(self, articles: list, processed_titles: set, stats=None, frontier=None):
+        """
+        Buffer articles for writing, flushing once a full batch is waiting.
+        :param articles: List of article dictionaries.
+        :param processed_titles: Set of already processed article titles; updated once written.
+        :param stats: Optional Counter of the submitting scraper.
+        :param frontier: Optional Frontier; each article's URL is marked done or failed once its write settles.
+        """
+        for article in articles:
+            if not article:
+                continue
+            title = article['Title']
+            url = normalize_url(article['URL']) if article.get('URL') else None
+            if title in self.titles or (url and url in self.urls):
+                self.duplicates += 1
+                mark_done(frontier, article)
+                continue
+            self.titles.add(title)
+            if url:
+                self.urls.add(url)
+            self._buffer.append((article, processed_titles, stats, frontier))
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        """Write everything in the buffer."""
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write, [article for article, _, _, _ in batch],
+            )
+        except Exception as e:
+            logging.error(f"Error writing {len(batch)} articles to {self.path}: {e}")
+            self.failed += len(batch)
+            for article, _, _, frontier in batch:
+                self.titles.discard(article['Title'])
+                if article.get('URL'):
+                    self.urls.discard(normalize_url(article['URL']))
+                mark_failed(frontier, article)
+            return
+        for article, processed_titles, stats, frontier in batch:
+            processed_titles.add(article['Title'])
+            self.written += 1
+            if stats is not None:
+                stats['saved'] += 1
+            mark_done(frontier, article)
+
+    async def close(self):
+        """Write the remaining articles and close the output."""
+        await self.flush()
+        with self._lock:
+            self._close()
+
+    def report(self) -> str:
+        return (f"{self.name}: {self.written} written, {self.duplicates} duplicates skipped, "
+                f"{self.failed} failed ({self.path})")
+
+
+class JsonlSink(LocalSink):
+    """Appends one JSON article per line to a file."""
+    name = "JSONL sink"
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            offset = 0
+            for line in iter(f.readline, b''):
+                try:
+                    article = json.loads(line) if line.strip() else None
+                except ValueError:
+                    if line.endswith(b'\n'):
+                        logging.warning(f"Skipping malformed line in {self.path}: {line[:80]!r}")
+                        offset = f.tell()
+                        continue
+                    # A crash mid-append leaves a torn last line; cut it off so new lines start clean
+                    logging.warning(f"Truncating incomplete last line of {self.path}: {line[:80]!r}")
+                    f.truncate(offset)
+                    break
+                offset = f.tell()
+                if not line.endswith(b'\n'):
+                    # Complete but unterminated: end it so the next append starts a new line
+                    f.write(b'\n')
+                if not isinstance(article, dict):
+                    continue
+                if article.get('Title'):
+                    self.titles.add(article['Title'])
+                if article.get('URL'):
+                    self.urls.add(normalize_url(article['URL']))
+
+    def _write(self, articles: list):
+        lines = ''.join(json.dumps(article, ensure_ascii=False) + '\n' for article in articles)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+
+class SqliteSink(LocalSink):
+    """Inserts articles into a local SQLite database, one transaction per batch."""
+    name = "SQLite sink"
+
+    def _open(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " title TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " date TEXT,"
+            " category TEXT,"
+            " source TEXT,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url)")
+        self._conn.commit()
+        for title, url in self._conn.execute("SELECT title, url FROM articles"):
+            self.titles.add(title)
+            if url:
+                self.urls.add(url)
+
+    def _write(self, articles: list):
+        now = time.time()
+        rows = [
+            (
+                article['Title'],
+                normalize_url(article['URL']) if article.get('URL') else None,
+                article.get('Date'),
+                article.get('Category'),
+                article.get('Source'),
+                json.dumps(article, ensure_ascii=False),
+                now,
+            )
+            for article in articles
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO articles (title, url, date, category, source, data, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def _close(self):
+        self._conn.close()
+
+
+def _create_sink(kind: str, path: str, batch_size: int, url: str, max_connections: int, retries: int):
+    if kind == "http":
+        if not url:
+            raise ValueError("The http sink needs the Flask server URL")
+        return get_ingest_client(url, batch_size, max_connections, retries)
+    if kind == "jsonl":
+        return JsonlSink(path, batch_size)
+    if kind == "sqlite":
+        return SqliteSink(path, batch_size)
+    raise ValueError(f"Unknown sink: {kind}")
+
+
+def get_sink(kind: str = "http", path: str = None, batch_size: int = 10, url: str = None,
+             max_connections: int = 4, retries: int = 3):
+    """
+    Return the process-wide article sink, created on first call.
+    :param kind: "http" uploads to the Flask server at url; "jsonl" and "sqlite" write to path.
+    """
+    return get_shared("sink", _create_sink, kind, path, batch_size, url, max_connections, retries)
@@ -0,0 +1,326 @@
+# Path: summarizer.py
+import asyncio
+import logging
+import os
+import threading
+import time
+from workers import get_executor, get_shared, run_in_pool
+
+MODEL_NAME = "facebook/bart-large-cnn"
+# "torch" runs the model as published (fp32), "int8" quantizes its linear layers
+# dynamically, "onnx" exports it to ONNX Runtime (needs optimum[onnxruntime])
+BACKENDS = ("torch", "int8", "onnx")
+ONNX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'onnx_models')
+# Input window used when a tokenizer reports no real limit
+DEFAULT_MAX_TOKENS = 1024
+
+
+def get_rss_mb():
+    """Return the resident memory of this process in MB, or None if it can't be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        # Linux: second field of statm is the resident set size in pages
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Summarizer:
+    """Summarization model that is loaded on first use and shared by every scraper."""
+
+    def __init__(self, model: str = MODEL_NAME, num_threads: int = None, backend: str = "torch"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown summarizer backend: {backend}")
+        self.model = model
+        self.backend = backend
+        # Caps the CPU threads the model may use for inference; None keeps the runtime's default
+        self.num_threads = num_threads
+        self._pipeline = None
+        self._lock = threading.Lock()
+        self.load_seconds = None
+        self.rss_before_mb = None
+        self.rss_after_mb = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._pipeline is not None
+
+    @property
+    def name(self) -> str:
+        """Model and backend, which together determine the summaries produced."""
+        return self.model if self.backend == "torch" else f"{self.model} ({self.backend})"
+
+    def _load_pipeline(self):
+        from transformers import AutoTokenizer, pipeline
+        if self.backend == "torch":
+            if self.num_threads:
+                import torch
+                torch.set_num_threads(self.num_threads)
+            return pipeline("summarization", model=self.model)
+        tokenizer = AutoTokenizer.from_pretrained(self.model)
+        if self.backend == "int8":
+            import torch
+            from transformers import AutoModelForSeq2SeqLM
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            model = AutoModelForSeq2SeqLM.from_pretrained(self.model)
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            return pipeline("summarization", model=model, tokenizer=tokenizer)
+        # onnx: export once, then load the saved export on later runs
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        session_options = onnxruntime.SessionOptions()
+        if self.num_threads:
+            session_options.intra_op_num_threads = self.num_threads
+        export_dir = os.path.join(ONNX_DIR, self.model.replace('/', '--'))
+        if os.path.isdir(export_dir):
+            model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, session_options=session_options)
+        else:
+            model = ORTModelForSeq2SeqLM.from_pretrained(self.model, export=True, session_options=session_options)
+            model.save_pretrained(export_dir)
+        return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+    def load(self):
+        """Load the model once; concurrent callers wait for the first load to finish."""
+        if self._pipeline is not None:
+            return self._pipeline
+        with self._lock:
+            if self._pipeline is None:
+                self.rss_before_mb = get_rss_mb()
+                start = time.perf_counter()
+                self._pipeline = self._load_pipeline()
+                self.load_seconds = time.perf_counter() - start
+                self.rss_after_mb = get_rss_mb()
+                logging.info(self.report())
+        return self._pipeline
+
+    def max_input_tokens(self) -> int:
+        """Tokens of text that fit the model's input window, not counting special tokens."""
+        tokenizer = self.load().tokenizer
+        limit = tokenizer.model_max_length
+        # Tokenizers without a configured limit report a huge sentinel value
+        if not limit or limit > 100000:
+            limit = DEFAULT_MAX_TOKENS
+        return limit - tokenizer.num_special_tokens_to_add()
+
+    def split(self, content: str, max_chunks: int) -> list:
+        """
+        Cut a text into at most max_chunks pieces of similar size that each fit
+        the input window. Text past max_chunks windows is dropped.
+        """
+        tokenizer = self.load().tokenizer
+        size = self.max_input_tokens()
+        ids = tokenizer(content, add_special_tokens=False, truncation=True, max_length=size * max_chunks)['input_ids']
+        if len(ids) <= size:
+            return [content]
+        chunks = -(-len(ids) // size)
+        step = -(-len(ids) // chunks)
+        return [tokenizer.decode(ids[i:i + step], skip_special_tokens=True) for i in range(0, len(ids), step)]
+
+    def _generate(self, contents: list, max_length: int, min_length: int) -> list:
+        summarizer = self.load()
+        summaries = summarizer(
+            contents,
+            max_length=max_length,
+            min_length=min_length,
+            do_sample=False,
+            truncation=True,
+            batch_size=len(contents),
+        )
+        return [s["summary_text"] for s in summaries]
+
+    def summarize(self, content: str, max_length: int = 130, min_length: int = 50, max_chunks: int = 1) -> str:
+        """Summarize a single text. Blocks while the model runs."""
+        return self.summarize_batch([content], max_length, min_length, max_chunks)[0]
+
+    def summarize_batch(self, contents: list, max_length: int = 130, min_length: int = 50,
+                        max_chunks: int = 1) -> list:
+        """
+        Summarize several texts in one padded forward pass. Blocks while the model runs.
+        Texts are truncated to the model's input window by its tokenizer. With
+        max_chunks > 1, longer texts are split into up to max_chunks windows
+        (map-reduce): every chunk of the batch is summarized in one pass, then
+        the joined chunk summaries of each long text are summarized again.
+        """
+        if max_chunks <= 1:
+            return self._generate(contents, max_length, min_length)
+        pieces = [self.split(content, max_chunks) for content in contents]
+        partial = self._generate([chunk for chunks in pieces for chunk in chunks], max_length, min_length)
+        summaries, long_texts, joined = [], [], []
+        position = 0
+        for index, chunks in enumerate(pieces):
+            parts = partial[position:position + len(chunks)]
+            position += len(chunks)
+            summaries.append(parts[0])
+            if len(chunks) > 1:
+                long_texts.append(index)
+                joined.append(' '.join(parts))
+        if joined:
+            for index, summary in zip(long_texts, self._generate(joined, max_length, min_length)):
+                summaries[index] = summary
+        return summaries
+
+    def report(self) -> str:
+        if not self.loaded:
+            return f"Summarizer {self.name} not loaded"
+        rss = f"{self.rss_after_mb:.0f} MB" if self.rss_after_mb is not None else "unknown"
+        delta = ""
+        if self.rss_after_mb is not None and self.rss_before_mb is not None:
+            delta = f" (+{self.rss_after_mb - self.rss_before_mb:.0f} MB)"
+        return f"Summarizer {self.name} loaded in {self.load_seconds:.1f}s, RSS {rss}{delta}"
+
+
+def get_summarizer(num_threads: int = None, model: str = MODEL_NAME, backend: str = "torch") -> Summarizer:
+    """Return the process-wide summarizer instance, created with the settings of the first call."""
+    return get_shared("summarizer", Summarizer, model, num_threads, backend)
+
+
+def summarize_texts(contents: list, max_length: int, min_length: int, num_threads: int = None,
+                    model: str = MODEL_NAME, backend: str = "torch", max_chunks: int = 1) -> list:
+    """
+    Summarize a batch with the summarizer of the calling process.
+    Runs inside a worker thread or process. If the batch fails, each text is
+    retried on its own and failures are returned in place of their summary.
+    """
+    summarizer = get_summarizer(num_threads, model, backend)
+    try:
+        return summarizer.summarize_batch(contents, max_length, min_length, max_chunks)
+    except Exception as e:
+        logging.error(f"Batch summarization of {len(contents)} texts failed, retrying one by one: {e}")
+    summaries = []
+    for content in contents:
+        try:
+            summaries.append(summarizer.summarize(content, max_length, min_length, max_chunks))
+        except Exception as e:
+            summaries.append(e)
+    return summaries
+
+
+class SummaryQueue:
+    """
+    Collects texts from every scraper and summarizes them in batches.
+    A batch is run as soon as it is full, or once the oldest pending text
+    has waited max_wait seconds.
+    """
+
+    def __init__(self, summarizer: Summarizer, batch_size: int = 8, max_wait: float = 0.5,
+                 max_length: int = 130, min_length: int = 50, executor=None, workers: int = 1,
+                 max_chunks: int = 1):
+        self.summarizer = summarizer
+        # Batches run in this pool (None means the loop's default thread pool)
+        self.executor = executor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_length = max_length
+        self.min_length = min_length
+        # Long texts are summarized in up to this many chunks; 1 truncates them
+        self.max_chunks = max_chunks
+        self.batches = 0
+        self.texts = 0
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._running = set()
+
+    def _ensure_worker(self):
+        # The queue and its worker belong to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.workers)
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, content: str) -> str:
+        """Queue a text for summarization and wait for its summary."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((content, future))
+        return await future
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            batch = [(content, future) for content, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            # Keep collecting the next batch while up to `workers` batches run
+            await self._slots.acquire()
+            task = self._loop.create_task(self._process(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _process(self, batch: list):
+        try:
+            contents = [content for content, _ in batch]
+            try:
+                summaries = await run_in_pool(
+                    self.executor, summarize_texts,
+                    contents, self.max_length, self.min_length, self.summarizer.num_threads,
+                    self.summarizer.model, self.summarizer.backend, self.max_chunks,
+                )
+            except Exception as e:
+                summaries = [e] * len(contents)
+            self.batches += 1
+            self.texts += len(contents)
+            for (_, future), summary in zip(batch, summaries):
+                if future.done():
+                    continue
+                if isinstance(summary, Exception):
+                    future.set_exception(summary)
+                else:
+                    future.set_result(summary)
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    def report(self) -> str:
+        average = self.texts / self.batches if self.batches else 0
+        return f"Summarized {self.texts} texts in {self.batches} batches (avg {average:.1f} per batch)"
+
+
+def _create_summary_queue(batch_size: int, max_wait: float, executor_kind: str, workers: int,
+                          num_threads: int, model: str, backend: str, max_chunks: int) -> SummaryQueue:
+    return SummaryQueue(
+        get_summarizer(num_threads, model, backend), batch_size=batch_size, max_wait=max_wait,
+        executor=get_executor("summarize", executor_kind, workers), workers=workers, max_chunks=max_chunks,
+    )
+
+
+def get_summary_queue(batch_size: int = 8, max_wait: float = 0.5, executor_kind: str = "thread",
+                      workers: int = 1, num_threads: int = None, model: str = MODEL_NAME,
+                      backend: str = "torch", max_chunks: int = 1) -> SummaryQueue:
+    """Return the process-wide summarization queue, created on first call."""
+    return get_shared("summary_queue", _create_summary_queue, batch_size, max_wait, executor_kind,
+                      workers, num_threads, model, backend, max_chunks)
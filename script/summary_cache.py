@@ -0,0 +1,94 @@
+# Path: summary_cache.py
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from workers import get_shared
+
+
+class SummaryCache:
+    """
+    On-disk cache of summaries keyed by a hash of the input text, the model
+    and the generation parameters. Least recently used entries are evicted
+    once the cache holds more than max_entries summaries.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    @staticmethod
+    def make_key(content: str, model: str, **params) -> str:
+        """Hash the text together with the model and generation parameters."""
+        digest = hashlib.sha256()
+        digest.update(model.encode('utf-8'))
+        for name in sorted(params):
+            digest.update(f"\0{name}={params[name]}".encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, summary: str):
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM summaries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, last_used) VALUES (?, ?, ?)",
+                (key, summary, time.time()),
+            )
+            if not exists:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict(self._size - self.max_entries)
+            self._conn.commit()
+
+    def _evict(self, count: int):
+        self._conn.execute(
+            "DELETE FROM summaries WHERE key IN "
+            "(SELECT key FROM summaries ORDER BY last_used ASC LIMIT ?)",
+            (count,),
+        )
+        self._size -= count
+        logging.info(f"Evicted {count} summaries from {self.path}")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0
+        return (f"Summary cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), "
+                f"{self._size} entries")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_summary_cache(path: str = 'summary_cache.db', max_entries: int = 50000) -> SummaryCache:
+    """Return the process-wide summary cache, opened on first call."""
+    return get_shared("summary_cache", SummaryCache, path, max_entries)
@@ -0,0 +1,140 @@
+# Path: sync.py
+import json
+import logging
+import os
+import threading
+import requests
+from membership import BloomFilter, normalize_url, title_key, url_key
+from workers import get_shared
+
+
+class KnownArticles:
+    """
+    Titles and URLs already stored on the Flask server, kept in a local file
+    together with the server's change cursor. Each sync only downloads the
+    articles added since the previous one. The first sync starts from the
+    server's membership filter instead of downloading the whole archive.
+    """
+
+    def __init__(self, path: str, server_url: str, page_size: int = 1000):
+        self.path = path
+        self.server_url = server_url
+        self.changes_url = server_url.rstrip('/') + '/changes'
+        self.filter_url = server_url.rstrip('/') + '/filter'
+        self.page_size = page_size
+        self.cursor = 0
+        self.titles = set()
+        self.urls = set()
+        # Bloom filter of everything stored before the cursor we started from, if bootstrapped from it
+        self.filter = None
+        self.synced = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.cursor = state.get('cursor', 0)
+            self.titles = set(state.get('titles', []))
+            self.urls = set(state.get('urls', []))
+            if state.get('filter'):
+                self.filter = BloomFilter.from_dict(state['filter'])
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, AttributeError) as e:
+            logging.error(f"Ignoring unreadable sync state {self.path}: {e}")
+
+    def _save(self):
+        state = {
+            'cursor': self.cursor,
+            'titles': sorted(self.titles),
+            'urls': sorted(self.urls),
+            'filter': self.filter.to_dict() if self.filter else None,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _apply(self, articles: list):
+        for article in articles:
+            if article.get('Title'):
+                self.titles.add(article['Title'])
+            if article.get('URL'):
+                self.urls.add(normalize_url(article['URL']))
+
+    def _full_sync(self):
+        # Servers without the changes endpoint only offer the whole archive
+        response = requests.get(self.server_url)
+        if response.status_code != 200:
+            logging.error(f"Error fetching initial data from Flask server: {response.status_code}")
+            return
+        articles = response.json()
+        if not isinstance(articles, list):
+            logging.error("Unexpected data format: articles is not a list.")
+            return
+        self.titles = set()
+        self.urls = set()
+        self.cursor = 0
+        self.filter = None
+        self._apply(articles)
+
+    def _bootstrap_from_filter(self) -> bool:
+        """Start from the server's membership filter and continue with deltas after its version."""
+        response = requests.get(self.filter_url)
+        if response.status_code != 200:
+            return False
+        data = response.json()
+        self.filter = BloomFilter.from_dict(data)
+        self.cursor = data['version']
+        logging.info(f"Bootstrapped from membership filter of {self.filter.count} keys "
+                     f"({len(data['bits'])} bytes, version {self.cursor})")
+        return True
+
+    def has_url(self, url: str) -> bool:
+        """True if the URL is known for certain."""
+        return normalize_url(url) in self.urls
+
+    def might_have_url(self, url: str) -> bool:
+        """True if the membership filter says the URL may be stored; confirm with the server."""
+        return self.filter is not None and url_key(url) in self.filter
+
+    def might_have_title(self, title: str) -> bool:
+        """True if the membership filter says the title may be stored; confirm with the server."""
+        return self.filter is not None and title_key(title) in self.filter
+
+    def sync(self):
+        """Fetch the articles added since the last sync. Runs once per process."""
+        with self._lock:
+            if self.synced:
+                return
+            received = 0
+            try:
+                if self.cursor == 0 and not self.titles:
+                    self._bootstrap_from_filter()
+                while True:
+                    response = requests.get(self.changes_url, params={'since': self.cursor, 'limit': self.page_size})
+                    if response.status_code == 404:
+                        self._full_sync()
+                        break
+                    if response.status_code != 200:
+                        logging.error(f"Error fetching changes from Flask server: {response.status_code}")
+                        break
+                    changes = response.json()
+                    self._apply(changes['articles'])
+                    received += len(changes['articles'])
+                    self.cursor = changes['cursor']
+                    if not changes['has_more']:
+                        break
+            except (requests.RequestException, ValueError) as e:
+                # Keep working from the local state; the next run catches up
+                logging.error(f"Failed to sync with Flask server: {e}")
+            self._save()
+            self.synced = True
+            logging.info(f"Synced {received} new articles, {len(self.titles)} known (cursor {self.cursor})")
+
+
+def get_known_articles(path: str, server_url: str) -> KnownArticles:
+    """Return the process-wide known-articles state, loaded on first call."""
+    return get_shared("known_articles", KnownArticles, path, server_url)
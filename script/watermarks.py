@@ -0,0 +1,57 @@
+# Path: watermarks.py
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from workers import get_shared
+
+
+class Watermarks:
+    """
+    Per-source high-water marks: the newest article links seen by the last
+    completed run. Listing pages are newest first, so once a page contains a
+    watermarked link everything after it has been crawled before.
+    """
+
+    def __init__(self, path: str, keep: int = 20):
+        self.path = path
+        # Number of newest links kept per source, in case some are removed from the listing
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._marks = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._marks = json.load(f)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError as e:
+            logging.error(f"Ignoring unreadable watermarks {path}: {e}")
+
+    def reached(self, source: str, links: list) -> bool:
+        """True if any of the links is at or below the source's watermark."""
+        mark = set(self._marks.get(source, {}).get('urls', []))
+        return any(link in mark for link in links)
+
+    def has(self, source: str) -> bool:
+        """True if the source has a watermark from an earlier run."""
+        return bool(self._marks.get(source, {}).get('urls'))
+
+    def advance(self, source: str, newest_links: list):
+        """Move the watermark to the newest links of a completed run and save it."""
+        if not newest_links:
+            return
+        with self._lock:
+            self._marks[source] = {
+                'urls': newest_links[:self.keep],
+                'updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            }
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._marks, f, indent=4)
+            os.replace(tmp_path, self.path)
+
+
+def get_watermarks(path: str) -> Watermarks:
+    """Return the process-wide watermarks, loaded on first call."""
+    return get_shared("watermarks", Watermarks, path)
@@ -0,0 +1,61 @@
+# Path: workers.py
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+
+# Process-wide objects by key, with the settings they were created with
+_shared = {}
+# Reentrant, as some objects build others while being created (e.g. the sink its ingest client)
+_shared_lock = threading.RLock()
+
+
+def get_shared(key: str, factory, *args, **kwargs):
+    """
+    Return the process-wide object for key, created with factory(*args, **kwargs) on first call.
+    Later calls must pass the same settings: a different one raises ValueError instead of
+    silently handing back an object configured otherwise.
+    """
+    settings = (args, kwargs)
+    with _shared_lock:
+        entry = _shared.get(key)
+        if entry is None:
+            shared = factory(*args, **kwargs)
+            _shared[key] = (shared, settings)
+            return shared
+        shared, created_with = entry
+        if created_with != settings:
+            raise ValueError(f"Shared {key} already exists with settings {created_with}, got {settings}")
+        return shared
+
+
+def _create_executor(name: str, kind: str, max_workers: int) -> concurrent.futures.Executor:
+    if kind == "process":
+        return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    if kind == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+    raise ValueError(f"Unknown executor kind: {kind}")
+
+
+def get_executor(name: str, kind: str = "thread", max_workers: int = None) -> concurrent.futures.Executor:
+    """
+    Return the named worker pool, creating it on first use.
+    :param name: Pool name, e.g. "parse" or "summarize".
+    :param kind: "thread" or "process".
+    :param max_workers: Number of workers in the pool.
+    """
+    return get_shared(f"executor:{name}", _create_executor, name, kind, max_workers)
+
+
+async def run_in_pool(executor: concurrent.futures.Executor, func, *args):
+    """Run a blocking function in a worker pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+@atexit.register
+def shutdown_executors():
+    with _shared_lock:
+        for key in [key for key in _shared if key.startswith("executor:")]:
+            executor, _ = _shared.pop(key)
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,51 +1,207 @@
-import json
 from flask import Flask, request, jsonify
+from collections import OrderedDict
+from datetime import datetime, timezone
+import gzip
+import json
+import logging
 import os
+import threading
+from storage import SORTS, ArticleStore, decode_cursor, parse_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 app = Flask(__name__)
+logging.basicConfig(level=logging.INFO)
 
-# Path to the JSON file
+# SQLite database holding the articles
+DB_PATH = os.environ.get('ARTICLES_DB', 'articles.db')
+# Old JSON database, imported into SQLite on first start
 DB_FILE = 'db.json'
 
-# Load articles from the JSON file
-def load_articles():
+# Open the article store (migrating db.json if needed)
+store = ArticleStore(DB_PATH, legacy_json=DB_FILE)
+
+# Largest page a client may request with ?limit=
+MAX_LIMIT = 1000
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+# Number of serialized responses kept between writes
+BODY_CACHE_SIZE = 64
+
+# (URL, encoding) -> (body, headers) for the current data version
+body_cache = OrderedDict()
+body_cache_version = None
+body_cache_lock = threading.Lock()
+
+def choose_encoding():
+    if brotli is not None and 'br' in request.accept_encodings:
+        return 'br'
+    if 'gzip' in request.accept_encodings:
+        return 'gzip'
+    return None
+
+def not_modified(version, last_modified):
+    """True if the client's cached copy, per If-None-Match or If-Modified-Since, is current."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(str(version))
+    if request.if_modified_since:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+def int_arg(name, default=None):
+    """Integer query argument; raises ValueError if it is present but not an integer."""
+    value = request.args.get(name)
+    if value is None:
+        return default
     try:
-        with open(DB_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f).get('articles', [])  # Ensure it returns a list of articles
-    except FileNotFoundError:
-        if not os.path.exists(DB_FILE):
-            with open(DB_FILE, 'w', encoding='utf-8') as f:
-                json.dump({'articles': []}, f, ensure_ascii=False, indent=4)
-        # Create a new db.json file if it doesn't exist
-        # with open(DB_FILE, 'w', encoding='utf-8') as f:
-        #     json.dump({'articles': []}, f, ensure_ascii=False, indent=4)
-        # return []  # Return an empty list
-    except json.JSONDecodeError:
-        # Return an empty list if the file is malformed
-        return []
-
-# Save articles to the JSON file
-def save_articles(data):
-    with open(DB_FILE, 'w', encoding='utf-8') as f:
-        json.dump({'articles': data}, f, ensure_ascii=False, indent=4)
-
-# Initialize articles from the file
-articles = load_articles()
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+def cached_json_response(build):
+    """
+    Serve the JSON produced by build() for the current request.
+    Answers conditional requests with 304, compresses large bodies, and caches
+    the serialized body until the next write. build() returns (data, headers).
+    """
+    global body_cache_version
+    version, last_modified = store.version, store.last_modified
+    if not_modified(version, last_modified):
+        response = app.response_class(status=304)
+    else:
+        encoding = choose_encoding()
+        key = (request.full_path, encoding)
+        with body_cache_lock:
+            if body_cache_version != version:
+                body_cache.clear()
+                body_cache_version = version
+            cached = body_cache.get(key)
+            if cached:
+                body_cache.move_to_end(key)
+        if cached:
+            body, headers = cached
+        else:
+            data, headers = build()
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            if encoding and len(body) >= COMPRESS_MIN_BYTES:
+                body = brotli.compress(body) if encoding == 'br' else gzip.compress(body)
+                headers = {**headers, 'Content-Encoding': encoding}
+            with body_cache_lock:
+                if body_cache_version == version:
+                    body_cache[key] = (body, headers)
+                    if len(body_cache) > BODY_CACHE_SIZE:
+                        body_cache.popitem(last=False)
+        response = app.response_class(body, mimetype='application/json', headers=headers)
+    response.set_etag(str(version), weak=True)
+    response.last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/data', methods=['GET'])
 def get_articles():
-    return jsonify(articles)
+    args = request.args
+    # Validate up front so bad requests get a 400 rather than a 304
+    try:
+        limit = int_arg('limit')
+        if limit is not None and not 0 < limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        offset = int_arg('offset', 0)
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        for name in ('from', 'to'):
+            if args.get(name) and not parse_date(args[name]):
+                raise ValueError(f"{name} must be an ISO date (YYYY-MM-DD)")
+        if args.get('sort', 'seq').lstrip('-') not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+        if args.get('cursor'):
+            decode_cursor(args['cursor'])
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    def build():
+        articles, next_cursor = store.query(
+            category=args.get('category'),
+            source=args.get('source'),
+            date_from=args.get('from'),
+            date_to=args.get('to'),
+            sort=args.get('sort', 'seq'),
+            limit=limit,
+            offset=offset,
+            cursor=args.get('cursor'),
+        )
+        return articles, {'X-Next-Cursor': next_cursor} if next_cursor else {}
+
+    return cached_json_response(build)
+
+@app.route('/data/changes', methods=['GET'])
+def get_changes():
+    try:
+        since = int_arg('since', 0)
+        limit = int_arg('limit', MAX_LIMIT)
+        if since < 0 or not 0 < limit <= MAX_LIMIT:
+            raise ValueError(f"since must be >= 0 and limit between 1 and {MAX_LIMIT}")
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    def build():
+        articles, cursor, has_more = store.changes_since(since, limit)
+        return {"articles": articles, "cursor": cursor, "has_more": has_more}, {}
+
+    return cached_json_response(build)
+
+@app.route('/data/filter', methods=['GET'])
+def get_membership_filter():
+    return cached_json_response(lambda: (store.membership_filter(), {}))
+
+@app.route('/data/exists', methods=['POST'])
+def check_exists():
+    query = request.json
+    if not isinstance(query, dict):
+        return jsonify({"message": "Expected an object with titles and/or urls"}), 400
+    titles = [t for t in query.get('titles', []) if isinstance(t, str)]
+    urls = [u for u in query.get('urls', []) if isinstance(u, str)]
+    if len(titles) + len(urls) > MAX_LIMIT:
+        return jsonify({"message": f"At most {MAX_LIMIT} titles and urls per request"}), 400
+    existing_titles, existing_urls = store.existing(titles, urls)
+    return jsonify({"titles": existing_titles, "urls": existing_urls})
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    return cached_json_response(lambda: (store.stats(), {}))
+
+def is_valid_article(article) -> bool:
+    """An article needs a non-empty string Title; its URL, if given, must be a string."""
+    return (isinstance(article, dict) and isinstance(article.get('Title'), str) and bool(article['Title'])
+            and isinstance(article.get('URL', ''), (str, type(None))))
 
 @app.route('/data', methods=['POST'])
 def add_article():
     article = request.json
-    if not article:
+    if not is_valid_article(article):
         return jsonify({"message": "Invalid data"}), 400
-    # Check for duplicate articles by Title
-    if not any(a['Title'] == article.get('Title') for a in articles):
-        articles.append(article)
-        save_articles(articles)  # Save updated articles to file
+    # Insert unless an article with the same Title or URL exists
+    if store.add(article):
         return jsonify(article), 201
     return jsonify({"message": "Article already exists"}), 409
 
+@app.route('/data/bulk', methods=['POST'])
+def add_articles_bulk():
+    batch = request.json
+    if not isinstance(batch, list):
+        return jsonify({"message": "Expected a list of articles"}), 400
+    results = [{"index": index, "status": "invalid"} for index in range(len(batch))]
+    valid = [index for index, article in enumerate(batch) if is_valid_article(article)]
+    # Dedupe against stored titles/URLs and within the batch, in one transaction
+    added = store.add_many([batch[index] for index in valid])
+    for index, was_added in zip(valid, added):
+        results[index] = {
+            "index": index,
+            "status": "created" if was_added else "conflict",
+            "Title": batch[index]['Title'],
+        }
+    return jsonify({"created": sum(added), "results": results}), 200
+
 if __name__ == '__main__':
     app.run()
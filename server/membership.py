@@ -0,0 +1,70 @@
+# Shared with script/membership.py; keep the two copies identical so keys and hashes match.
+import base64
+import hashlib
+import math
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_title(title: str) -> str:
+    """Title used for duplicate detection: case-folded with whitespace collapsed."""
+    return ' '.join(title.split()).casefold()
+
+
+def normalize_url(url: str) -> str:
+    """URL used for duplicate detection: lowercase host, no fragment or trailing slash."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+
+def title_key(title: str) -> str:
+    return 't:' + normalize_title(title)
+
+
+def url_key(url: str) -> str:
+    return 'u:' + normalize_url(url)
+
+
+class BloomFilter:
+    """
+    Compact set membership test with no false negatives. Positions come from
+    SHA-256 so the server and the scrapers compute the same bits.
+    """
+
+    def __init__(self, size: int, hashes: int, bits: bytearray = None, count: int = 0):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01) -> 'BloomFilter':
+        capacity = max(capacity, 1)
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes)
+
+    def _positions(self, key: str):
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def to_dict(self) -> dict:
+        return {
+            'size': self.size,
+            'hashes': self.hashes,
+            'count': self.count,
+            'bits': base64.b64encode(bytes(self.bits)).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BloomFilter':
+        return cls(data['size'], data['hashes'], bytearray(base64.b64decode(data['bits'])), data.get('count', 0))
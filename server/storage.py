@@ -0,0 +1,342 @@
+import base64
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from membership import BloomFilter, normalize_title, normalize_url, title_key, url_key
+
+# Date formats the scrapers produce, tried in order
+DATE_FORMATS = ['%B %d, %Y', '%b %d, %Y', '%B %d, %Y %I:%M %p', '%Y-%m-%d']
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS articles (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        date TEXT,
+        date_iso TEXT,
+        category TEXT,
+        source TEXT,
+        url TEXT,
+        data TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_articles_title ON articles (title)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (date_iso)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source)",
+]
+
+# Smallest number of items the membership filter is sized for
+FILTER_MIN_CAPACITY = 1024
+
+# Sort names accepted by ArticleStore.query, mapped to their column
+SORTS = {'seq': 'seq', 'date': 'date_iso'}
+
+
+def parse_date(value):
+    """Convert an article date such as 'August 12, 2024' to ISO format, or None."""
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def encode_cursor(key, seq: int) -> str:
+    """Opaque pagination cursor holding the sort key and seq of the last row returned."""
+    return base64.urlsafe_b64encode(json.dumps([key, seq]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        key, seq = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return key, int(seq)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class Rollups:
+    """Article counts by date, category and source, updated as articles are inserted."""
+
+    def __init__(self):
+        self.total = 0
+        self.by_year = Counter()
+        self.by_month = Counter()
+        self.by_day = Counter()
+        self.by_category = Counter()
+        self.by_source = Counter()
+        self.by_year_category = defaultdict(Counter)
+        self.latest_by_source = {}
+
+    def add(self, date_iso: str, category: str, source: str):
+        self.total += 1
+        if category:
+            self.by_category[category] += 1
+        if source:
+            self.by_source[source] += 1
+        if not date_iso:
+            return
+        self.by_year[date_iso[:4]] += 1
+        self.by_month[date_iso[:7]] += 1
+        self.by_day[date_iso] += 1
+        if category:
+            self.by_year_category[date_iso[:4]][category] += 1
+        if source and date_iso > self.latest_by_source.get(source, ''):
+            self.latest_by_source[source] = date_iso
+
+    def to_dict(self) -> dict:
+        return {
+            'total': self.total,
+            'by_year': dict(self.by_year),
+            'by_month': dict(self.by_month),
+            'by_day': dict(self.by_day),
+            'by_category': dict(self.by_category),
+            'by_source': dict(self.by_source),
+            'by_year_category': {year: dict(counts) for year, counts in self.by_year_category.items()},
+            'latest_by_source': dict(self.latest_by_source),
+        }
+
+
+class ArticleStore:
+    """
+    Articles stored in SQLite (WAL mode). Each insert only appends rows, so
+    the cost of a write doesn't grow with the size of the archive.
+    Normalized titles and URLs are also kept in memory so duplicate checks
+    are a set lookup, along with running counts for the stats endpoint.
+    """
+
+    def __init__(self, path: str, legacy_json: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+        self._titles = set()
+        self._urls = set()
+        self._rollups = Rollups()
+        self._filter = None
+        self.index_build_seconds = self._build_index()
+        # Data version: seq of the newest article. Only inserts change the data, so it identifies its state.
+        self.version = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM articles").fetchone()[0]
+        # Whole seconds, as sent in Last-Modified. Start from now: in WAL mode the database
+        # file's mtime can predate the last write, which may still be in the -wal file.
+        self.last_modified = math.ceil(time.time())
+        if legacy_json:
+            self.migrate_json(legacy_json)
+
+    def _build_index(self) -> float:
+        start = time.perf_counter()
+        rows = self._conn.execute("SELECT title, url, date_iso, category, source FROM articles")
+        for title, url, date_iso, category, source in rows:
+            self._titles.add(normalize_title(title))
+            if url:
+                self._urls.add(normalize_url(url))
+            self._rollups.add(date_iso, category, source)
+        self._rebuild_filter()
+        elapsed = time.perf_counter() - start
+        logging.info(f"Built duplicate index of {len(self._titles)} titles and "
+                     f"{len(self._urls)} URLs, and stats rollups, in {elapsed * 1000:.1f} ms")
+        return elapsed
+
+    def _rebuild_filter(self):
+        # Sized for twice the current items so it only needs rebuilding after the archive doubles
+        self._filter_capacity = max(FILTER_MIN_CAPACITY, 2 * (len(self._titles) + len(self._urls)))
+        self._filter = BloomFilter.for_capacity(self._filter_capacity)
+        for title in self._titles:
+            self._filter.add(title_key(title))
+        for url in self._urls:
+            self._filter.add(url_key(url))
+
+    def is_duplicate(self, article: dict) -> bool:
+        """True if an article with the same normalized title or URL is stored."""
+        if normalize_title(article['Title']) in self._titles:
+            return True
+        url = article.get('URL')
+        return bool(url) and normalize_url(url) in self._urls
+
+    def migrate_json(self, json_path: str):
+        """Import articles from an old db.json once, then rename the file so it isn't imported again."""
+        if not os.path.exists(json_path) or self.count():
+            return
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                articles = json.load(f).get('articles', [])
+        except json.JSONDecodeError as e:
+            logging.error(f"Could not migrate {json_path}: {e}")
+            return
+        # Keep the first copy of any duplicated title, as the old server did
+        added = self.add_many([article for article in articles if article.get('Title')])
+        os.replace(json_path, json_path + '.migrated')
+        logging.info(f"Migrated {sum(added)} articles from {json_path} to {self.path}")
+
+    @staticmethod
+    def _row(article: dict) -> tuple:
+        return (
+            article['Title'],
+            article.get('Date'),
+            parse_date(article.get('Date')) or '',
+            article.get('Category'),
+            article.get('Source'),
+            article.get('URL'),
+            json.dumps(article, ensure_ascii=False),
+        )
+
+    def add_many(self, articles: list) -> list:
+        """
+        Insert the articles whose title and URL aren't stored yet, in a single transaction.
+        Returns one flag per article: True if it was inserted, False if it was a duplicate.
+        """
+        added = []
+        rows = []
+        with self._lock:
+            titles = set()
+            urls = set()
+            for article in articles:
+                url = article.get('URL')
+                exists = (
+                    self.is_duplicate(article)
+                    or normalize_title(article['Title']) in titles
+                    or (bool(url) and normalize_url(url) in urls)
+                )
+                added.append(not exists)
+                if not exists:
+                    titles.add(normalize_title(article['Title']))
+                    if url:
+                        urls.add(normalize_url(url))
+                    rows.append(self._row(article))
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO articles (title, date, date_iso, category, source, url, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            # Only index the batch once it is committed
+            self._titles.update(titles)
+            self._urls.update(urls)
+            for title in titles:
+                self._filter.add(title_key(title))
+            for url in urls:
+                self._filter.add(url_key(url))
+            if self._filter.count > self._filter_capacity:
+                self._rebuild_filter()
+            for row in rows:
+                # _row order: title, date, date_iso, category, source, ...
+                self._rollups.add(row[2], row[3], row[4])
+            if rows:
+                self.version = self._conn.execute("SELECT MAX(seq) FROM articles").fetchone()[0]
+                # Step by at least a second, so a write in the same second as a client's
+                # earlier GET still fails its If-Modified-Since check
+                self.last_modified = max(math.ceil(time.time()), self.last_modified + 1)
+        return added
+
+    def add(self, article: dict) -> bool:
+        """Insert an article unless its title or URL is already stored."""
+        return self.add_many([article])[0]
+
+    def all(self) -> list:
+        """Return every article in insertion order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM articles ORDER BY seq").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def query(self, category: str = None, source: str = None, date_from: str = None, date_to: str = None,
+              sort: str = 'seq', limit: int = None, offset: int = 0, cursor: str = None):
+        """
+        Return (articles, next_cursor) matching the filters.
+        :param date_from: Earliest ISO date (inclusive).
+        :param date_to: Latest ISO date (inclusive).
+        :param sort: One of SORTS; prefix with '-' for descending order.
+        :param cursor: next_cursor of the previous page; faster than offset on deep pages.
+        """
+        if sort.lstrip('-') not in SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        descending = sort.startswith('-')
+        column = SORTS[sort.lstrip('-')]
+        where = []
+        params = []
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        if date_from:
+            where.append("date_iso >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("date_iso <= ? AND date_iso != ''")
+            params.append(date_to)
+        if cursor:
+            key, seq = decode_cursor(cursor)
+            op = '<' if descending else '>'
+            if column == 'seq':
+                where.append(f"seq {op} ?")
+                params.append(seq)
+            else:
+                where.append(f"({column}, seq) {op} (?, ?)")
+                params.extend([key, seq])
+        direction = 'DESC' if descending else 'ASC'
+        order = "seq" if column == 'seq' else f"{column} {direction}, seq"
+        sql = f"SELECT {column}, seq, data FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} {direction}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        elif offset:
+            sql += " LIMIT -1 OFFSET ?"
+            params.append(offset)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        next_cursor = None
+        if limit is not None and len(rows) == limit:
+            key, seq, _ = rows[-1]
+            next_cursor = encode_cursor(key, seq)
+        return [json.loads(data) for _, _, data in rows], next_cursor
+
+    def changes_since(self, since: int, limit: int) -> tuple:
+        """
+        Return (articles, cursor, has_more) for articles inserted after seq `since`.
+        Pass the returned cursor as `since` to continue.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, data FROM articles WHERE seq > ? ORDER BY seq LIMIT ?", (since, limit + 1)
+            ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        cursor = rows[-1][0] if rows else since
+        return [json.loads(data) for _, data in rows], cursor, has_more
+
+    def membership_filter(self) -> dict:
+        """Bloom filter over normalized titles and URLs, with the data version it reflects."""
+        with self._lock:
+            return {'version': self.version, **self._filter.to_dict()}
+
+    def existing(self, titles: list, urls: list) -> tuple:
+        """Return the given titles and URLs that are stored, compared after normalization."""
+        with self._lock:
+            return (
+                [title for title in titles if normalize_title(title) in self._titles],
+                [url for url in urls if normalize_url(url) in self._urls],
+            )
+
+    def stats(self) -> dict:
+        """Counts by year, month, day, category and source, and the latest date per source."""
+        with self._lock:
+            return self._rollups.to_dict()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
@@ -10,6 +10,7 @@ import calendar
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 import re
+import threading
 
 # Download NLTK data
 nltk.download("punkt")
@@ -21,18 +22,50 @@ st.set_page_config(page_title="Security News Analysis", page_icon=logo, layout="
 
 # URL ของ API
 API_URL = "https://piyamianglae.pythonanywhere.com/data"
+# Articles added since a cursor
+CHANGES_URL = "https://piyamianglae.pythonanywhere.com/data/changes"
+# Aggregate counts maintained by the server
+STATS_URL = "https://piyamianglae.pythonanywhere.com/stats"
+
+# Seconds before the articles and the stats are refreshed; shared so the charts and lists agree
+CACHE_TTL = 600
+
+# Articles received so far and the server cursor they reach, kept for the life of the app
+@st.cache_resource
+def get_sync_state():
+    return {"articles": [], "cursor": 0, "lock": threading.Lock()}
+
+# Function to fetch only the articles added since the last sync
+def sync_articles(state):
+    while True:
+        response = requests.get(CHANGES_URL, params={"since": state["cursor"], "limit": 1000})
+        if response.status_code == 404:
+            # Older servers have no changes endpoint; fetch everything
+            response = requests.get(API_URL)
+            if response.status_code == 200:
+                state["articles"] = response.json()
+                state["cursor"] = 0
+            return response
+        if response.status_code != 200:
+            return response
+        changes = response.json()
+        state["articles"].extend(changes["articles"])
+        state["cursor"] = changes["cursor"]
+        if not changes["has_more"]:
+            return response
 
 # Function to load and preprocess data from API
-@st.cache_data(ttl=86400) 
+@st.cache_data(ttl=CACHE_TTL)
 def load_data_from_api():
     try:
         # ดึงข้อมูลจาก API
-        response = requests.get(API_URL)
-        if response.status_code != 200:
-            st.error(f"Error fetching data from API: {response.text}")
-            return None
-        
-        data = response.json()
+        state = get_sync_state()
+        with state["lock"]:
+            response = sync_articles(state)
+            if response.status_code != 200:
+                st.error(f"Error fetching data from API: {response.text}")
+                return None
+            data = list(state["articles"])
 
         # เปลี่ยนข้อมูลเป็น DataFrame
         df = pd.DataFrame(data)
@@ -53,6 +86,32 @@ def load_data_from_api():
         return None
 
 
+# Function to load pre-computed statistics from the API
+@st.cache_data(ttl=CACHE_TTL)
+def load_stats_from_api():
+    try:
+        response = requests.get(STATS_URL)
+        if response.status_code != 200:
+            return None
+        return response.json()
+    except (requests.RequestException, ValueError):
+        # Older servers have no stats endpoint; fall back to computing from the data
+        return None
+
+# Zero-padded month number of a month name, as in the "YYYY-MM" keys of the stats
+def month_key(month_name):
+    return f"{list(calendar.month_name).index(month_name):02d}"
+
+# Number of articles in the selected Month and Year, from the server's rollups
+def stats_total(stats, selected_month, selected_year):
+    if selected_month == "All" and selected_year == "All":
+        return stats["total"]
+    if selected_month == "All":
+        return stats["by_year"].get(str(selected_year), 0)
+    suffix = "-" + month_key(selected_month)
+    if selected_year == "All":
+        return sum(count for month, count in stats["by_month"].items() if month.endswith(suffix))
+    return stats["by_month"].get(f"{selected_year}{suffix}", 0)
 
 # Function to convert DataFrame to CSV, JSON, or Excel
 def convert_df(df, file_format):
@@ -108,8 +167,14 @@ def main():
         filtered_df = filtered_df[filtered_df["Category"] == selected_category]
 
 
+    stats = load_stats_from_api()
+
     # Group by Source and get the latest update for each source
-    latest_updates = df.groupby('Source')['Date'].max().reset_index()
+    if stats:
+        latest_updates = pd.DataFrame(list(stats["latest_by_source"].items()), columns=["Source", "Date"])
+        latest_updates["Date"] = pd.to_datetime(latest_updates["Date"])
+    else:
+        latest_updates = df.groupby('Source')['Date'].max().reset_index()
     
     # Sort the updates by Date in descending order
     latest_updates = latest_updates.sort_values(by='Date', ascending=False)
@@ -156,11 +221,19 @@ def main():
     # Summary
     st.subheader(f"Yearly Summary" if selected_month == "All" or selected_year == "All" else "Monthly Summary")
 
+    # The server's rollups cover the unfiltered views; other filters are computed from the rows
+    all_dates = selected_month == "All" and selected_year == "All"
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Total Articles", len(filtered_df))
+        if stats and selected_category == "All":
+            st.metric("Total Articles", stats_total(stats, selected_month, selected_year))
+        else:
+            st.metric("Total Articles", len(filtered_df))
     with col2:
-        unique_attack_types = len(filtered_df["Category"].unique())
+        if stats and all_dates and selected_category == "All":
+            unique_attack_types = len(stats["by_category"])
+        else:
+            unique_attack_types = len(filtered_df["Category"].unique())
         st.metric("Unique Attack Types", unique_attack_types)
 
     # Attack Types Trend
@@ -186,7 +259,14 @@ def main():
                 .value_counts()
                 .unstack(fill_value=0)
             )
-        elif selected_month == "All" and selected_year == "All":
+        elif all_dates and stats:
+            # กรณีไม่ได้เลือกทั้งเดือนและปี: ใช้ยอดรวมตามปีและประเภทจากเซิร์ฟเวอร์
+            attack_timeline = pd.DataFrame.from_dict(stats["by_year_category"], orient="index").fillna(0).astype(int)
+            attack_timeline.index = attack_timeline.index.astype(int)
+            attack_timeline = attack_timeline.sort_index()
+            if selected_category != "All":
+                attack_timeline = attack_timeline.reindex(columns=[selected_category], fill_value=0)
+        elif all_dates:
             # กรณีไม่ได้เลือกทั้งเดือนและปี: รวมข้อมูลทั้งหมดตามปี
             attack_timeline = (
                 filtered_df.groupby("Year")["Category"]
@@ -241,7 +321,12 @@ def main():
 
     with col2:
         st.subheader("Attack Types Distribution")
-        attack_counts = filtered_df["Category"].value_counts()
+        if stats and all_dates:
+            attack_counts = pd.Series(stats["by_category"], dtype=int).sort_values(ascending=False)
+            if selected_category != "All":
+                attack_counts = attack_counts[attack_counts.index == selected_category]
+        else:
+            attack_counts = filtered_df["Category"].value_counts()
         fig_attacks = px.pie(
             values=attack_counts.values,
             names=attack_counts.index,
@@ -251,12 +336,41 @@ def main():
 
     # Yearly Attacks
     st.subheader("Yearly Attacks")
-    attacks_by_year = df.groupby("Year").size().reset_index(name="count")
+    if stats:
+        attacks_by_year = pd.DataFrame(
+            [(int(year), count) for year, count in stats["by_year"].items()], columns=["Year", "count"]
+        )
+    else:
+        attacks_by_year = df.groupby("Year").size().reset_index(name="count")
     # Sort by Year in descending order◘
     attacks_by_year = attacks_by_year.sort_values(by="Year", ascending=False)
     fig_yearly_attacks = px.bar(attacks_by_year, x="Year", y="count")
     fig_yearly_attacks.update_xaxes(type="category")
     st.plotly_chart(fig_yearly_attacks, use_container_width=True)
+
+    # Monthly attacks of the selected year, or daily attacks of the selected month
+    if selected_year != "All" and selected_category == "All":
+        if selected_month == "All":
+            st.subheader(f"Monthly Attacks - {selected_year}")
+            prefix = f"{selected_year}-"
+            if stats:
+                counts = stats["by_month"]
+            else:
+                counts = filtered_df["Date"].dt.strftime("%Y-%m").value_counts().to_dict()
+        else:
+            st.subheader(f"Daily Attacks - {selected_month} {selected_year}")
+            prefix = f"{selected_year}-{month_key(selected_month)}-"
+            if stats:
+                counts = stats["by_day"]
+            else:
+                counts = filtered_df["Date"].dt.strftime("%Y-%m-%d").value_counts().to_dict()
+        attacks_by_period = pd.DataFrame(
+            sorted((period, count) for period, count in counts.items() if period.startswith(prefix)),
+            columns=["Date", "count"],
+        )
+        fig_period_attacks = px.bar(attacks_by_period, x="Date", y="count")
+        fig_period_attacks.update_xaxes(type="category")
+        st.plotly_chart(fig_period_attacks, use_container_width=True)
     
     # Initialize session state for news limit
     if "news_limit" not in st.session_state: